@@ -0,0 +1,358 @@
+"""
+Declarative field extraction for the backend server
+Each field is an ordered list of fallback paths into a search result. All the
+paths are compiled into a single tree walk, so that shared prefixes (e.g.
+update.actor) are only traversed once per result.
+"""
+
+import threading
+
+_MISSING = object()
+
+
+def _present(value):
+    """Same test as an `or` chain, except that 0 is a value"""
+    return value is not None and value != "" and value != {} and value != []
+
+
+def _split(path):
+    return tuple(int(part) if part.isdigit() else part for part in path.split("."))
+
+
+def update_paths(*paths):
+    """
+    Expand paths relative to the post: search results either are the post or
+    wrap it in an `update` key, which is tried first
+    """
+    expanded = []
+    for path in paths:
+        if isinstance(path, tuple):
+            path, transform = path
+            expanded.extend([(f"update.{path}", transform), (path, transform)])
+        else:
+            expanded.extend([f"update.{path}", path])
+    return expanded
+
+
+class Field:
+    """
+    A field extracted from search results
+
+    - `paths`: fallbacks in order of preference, dotted keys into the result.
+      A number indexes a list, `*` means the first element of a list for which
+      the rest of the path has a value. A path may be a (path, transform)
+      pair, the transform being applied to the value found.
+    - `types`: values of other types are skipped as if missing
+    - `default`: the value when no path has one
+    """
+
+    def __init__(self, name, paths, types=str, default=""):
+        self.name = name
+        self.paths = [
+            path if isinstance(path, tuple) else (path, None) for path in paths
+        ]
+        self.types = types
+        self.default = default
+
+
+class _Node:
+    def __init__(self):
+        self.children = {}
+        self.slots = []
+
+
+def _compile(node):
+    slots = node.slots
+    children = [(part, _compile(child)) for part, child in node.children.items()]
+
+    def visit(value, out):
+        for slot, types in slots:
+            if out[slot] is _MISSING and isinstance(value, types) and _present(value):
+                out[slot] = value
+        for part, child in children:
+            if part == "*":
+                if isinstance(value, list):
+                    for item in value:
+                        child(item, out)
+            elif isinstance(part, int):
+                if isinstance(value, list) and len(value) > part:
+                    child(value[part], out)
+            elif isinstance(value, dict):
+                item = value.get(part)
+                if item is not None:
+                    child(item, out)
+
+    return visit
+
+
+class Extractor:
+    """
+    Fields compiled into one accessor. Counts which path every field was
+    found at (or that it was missing), see stats()
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        root = _Node()
+        slot_of = {}
+        # Field name -> [(slot, path, transform)]
+        self._plan = []
+        for field in fields:
+            plan = []
+            for path, transform in field.paths:
+                key = (path, field.types)
+                if key not in slot_of:
+                    slot_of[key] = len(slot_of)
+                    node = root
+                    for part in _split(path):
+                        node = node.children.setdefault(part, _Node())
+                    node.slots.append((slot_of[key], field.types))
+                plan.append((slot_of[key], path, transform))
+            self._plan.append((field.name, field.default, plan))
+
+        self._slot_count = len(slot_of)
+        self._visit = _compile(root)
+        self._lock = threading.Lock()
+        self._counts = {
+            name: dict.fromkeys([path for _, path, _ in plan] + [None], 0)
+            for name, _, plan in self._plan
+        }
+
+    def _extract(self, result, counts):
+        out = [_MISSING] * self._slot_count
+        self._visit(result, out)
+        fields = {}
+        for name, default, plan in self._plan:
+            value = default
+            fired = None
+            for slot, path, transform in plan:
+                found = out[slot]
+                if found is _MISSING:
+                    continue
+                if transform is not None:
+                    found = transform(found)
+                    if not _present(found):
+                        continue
+                value = found
+                fired = path
+                break
+            counts[name][fired] += 1
+            fields[name] = value
+        return fields
+
+    def extract(self, result):
+        return self.extract_many([result])[0]
+
+    def extract_many(self, results):
+        """Extract the fields of every result, in one pass"""
+        counts = {
+            name: dict.fromkeys(paths, 0) for name, paths in self._counts.items()
+        }
+        extracted = [self._extract(result, counts) for result in results]
+        with self._lock:
+            for name, paths in counts.items():
+                for path, count in paths.items():
+                    self._counts[name][path] += count
+        return extracted
+
+    def stats(self):
+        """
+        {field: {path: count}}, the count of the null path being the results
+        the field was missing from. Paths that never fired are kept, with a
+        count of 0, so that dead paths show up
+        """
+        with self._lock:
+            return {
+                name: {
+                    (path if path is not None else "(missing)"): count
+                    for path, count in paths.items()
+                }
+                for name, paths in self._counts.items()
+            }
+
+
+def _before_bullet(text):
+    return text.split("•")[0].strip()
+
+
+def _listify(value):
+    return value if isinstance(value, list) else [value]
+
+
+COMPANY_LOGO = "image.attributes.*.detailData.nonEntityCompanyLogo.company"
+
+SEARCH_RESULT_FIELDS = [
+    Field(
+        "urn",
+        [
+            "update.metadata.backendUrn",
+            "update.metadata.shareUrn",
+            "update.entityUrn",
+            "trackingUrn",
+            "dashEntityUrn",
+            "entityUrn",
+            "urn",
+            "actorNavigationContext.trackingUrn",
+            "actorNavigationContext.entityUrn",
+        ],
+    ),
+    Field("id", update_paths("id"), types=(str, int), default=None),
+    Field(
+        "text",
+        update_paths(
+            "commentary.text.text",
+            "commentary.text",
+            "summary.text",
+            "actorNavigationContext.summary.text",
+            "text.text",
+            "text",
+            "description.text",
+            "description",
+            "content.text",
+        ),
+    ),
+    Field("template", update_paths("template")),
+    Field("title", update_paths("title.text")),
+    Field("primarySubtitle", update_paths("primarySubtitle.text")),
+    Field("secondarySubtitle", update_paths("secondarySubtitle.text")),
+    Field(
+        "relativeTime",
+        [
+            "update.actor.subDescription.text",
+            "update.actor.subDescription.accessibilityText",
+            "secondarySubtitle.text",
+            "secondarySubtitle.accessibilityText",
+        ],
+        default=None,
+    ),
+    Field(
+        "createdAt",
+        update_paths(
+            "createdAt",
+            "created",
+            "time",
+            "publishedAt",
+            "createdTime",
+            "publishedTime",
+            "actorNavigationContext.createdAt",
+            "actorNavigationContext.created",
+        ),
+        types=(str, int, float),
+    ),
+    Field(
+        "jobPostedAt",
+        update_paths(
+            "insightsResolutionResults.0.jobPostingFooterInsight.footerItems.0.timeAt"
+        ),
+        types=(int, float),
+        default=None,
+    ),
+    Field("actorName", ["update.actor.name.text"]),
+    Field(
+        "authorName",
+        update_paths(
+            "actorNavigationContext.image.accessibilityText",
+            "actorNavigationContext.title.text",
+            "actorNavigationContext.image.attributes.*.accessibilityText",
+            ("headline.text", _before_bullet),
+            "headline.attributes.*.detailData.actorName.text",
+            "image.accessibilityText",
+            "image.accessibilityTextAttributes.*.text",
+        ),
+    ),
+    Field(
+        "authorUrn",
+        ["update.actor.backendUrn"]
+        + update_paths(
+            "actorNavigationContext.entityUrn",
+            "actorNavigationContext.trackingUrn",
+            "actorNavigationContext.image.attributes.0.detailData"
+            ".nonEntityProfilePicture.profile.entityUrn",
+            "headline.attributes.*.detailData.urn",
+            "headline.attributes.*.detailData.profile",
+        ),
+    ),
+    Field(
+        "authorProfileUrl",
+        ["update.actor.navigationContext.actionTarget"]
+        + update_paths(
+            "actorNavigationContext.url", "actorNavigationContext.actorNavigationUrl"
+        ),
+    ),
+    Field(
+        "likes",
+        ["update.socialDetail.totalSocialActivityCounts.numLikes"]
+        + update_paths("numLikes", "likes", "likeCount"),
+        types=int,
+        default=0,
+    ),
+    Field(
+        "comments",
+        ["update.socialDetail.totalSocialActivityCounts.numComments"]
+        + update_paths("numComments", "comments", "commentCount"),
+        types=int,
+        default=0,
+    ),
+    Field(
+        "shares",
+        ["update.socialDetail.totalSocialActivityCounts.numShares"]
+        + update_paths("numShares", "shares", "shareCount"),
+        types=int,
+        default=0,
+    ),
+    Field(
+        "url",
+        [
+            "update.header.navigationContext.actionTarget",
+            "update.socialDetail.shareUrl",
+        ]
+        + update_paths(
+            "navigationUrl", "navigationContext.url", "url", "postUrl", "permalink"
+        ),
+    ),
+    Field("entityUrn", update_paths("entityUrn")),
+    Field("trackingId", ["trackingId", "update.trackingId"]),
+    Field(
+        "companyName",
+        ["update.metadata.group.name", "update.content.entityComponent.subtitle.text"],
+    ),
+    Field("companyUrn", ["update.metadata.group.entityUrn"]),
+    Field("logoCompanyName", update_paths(f"{COMPANY_LOGO}.name")),
+    Field("logoCompanyUrn", update_paths(f"{COMPANY_LOGO}.entityUrn")),
+    Field(
+        "embeddedCompanyName",
+        update_paths(
+            "entityEmbeddedObject.title.text",
+            f"entityEmbeddedObject.{COMPANY_LOGO}.name",
+        ),
+    ),
+    Field(
+        "embeddedCompanyUrn",
+        update_paths(f"entityEmbeddedObject.{COMPANY_LOGO}.entityUrn"),
+    ),
+    Field(
+        "media",
+        [
+            ("update.content.imageComponent", _listify),
+            ("update.content.entityComponent.image", _listify),
+        ]
+        + update_paths(
+            ("media", _listify),
+            ("images", _listify),
+            ("image", _listify),
+            ("actorImages", _listify),
+            ("actorNavigationContext.image", _listify),
+        ),
+        types=(dict, list),
+        default=None,
+    ),
+    Field("type", update_paths("type")),
+    Field(
+        "visibility",
+        ["update.metadata.shareAudience"] + update_paths("visibility", "privacy"),
+    ),
+    Field("language", update_paths("language")),
+    Field("updatedAt", update_paths("updatedAt", "updated")),
+]
+
+search_result_extractor = Extractor(SEARCH_RESULT_FIELDS)
@@ -0,0 +1,112 @@
+"""
+Multi-keyword matcher for the backend server
+Finds every keyword of a poll in one pass over each text (Aho-Corasick)
+"""
+
+from collections import deque
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a list of keywords, built once and reused
+    for every post of a poll.
+
+    - `whole_words`: a keyword only matches when it is not part of a longer
+      word ("AI" matches "AI, ML" but not "said").
+    - `case_sensitive`: by default texts and keywords are case folded
+      (str.casefold, so "STRASSE" also matches "straße").
+    """
+
+    def __init__(self, keywords, whole_words=False, case_sensitive=False):
+        self.keywords = []
+        self.whole_words = whole_words
+        self.case_sensitive = case_sensitive
+
+        # Trie: one {char: state} dict per state, state 0 being the root
+        self._goto = [{}]
+        self._fail = [0]
+        # Indexes in self.keywords of the keywords ending at each state
+        self._output = [[]]
+
+        for keyword in keywords:
+            keyword = keyword if isinstance(keyword, str) else str(keyword)
+            pattern = self._fold(keyword.strip())
+            if not pattern or keyword in self.keywords:
+                continue
+            self.keywords.append(keyword)
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(self.keywords) - 1, len(pattern)))
+
+        # Failure links, breadth first so that a state's fail is set before
+        # its children's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def _fold(self, text):
+        return text if self.case_sensitive else text.casefold()
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def search(self, text):
+        """Return the indexes (in self.keywords) of the keywords found in text"""
+        found = set()
+        if not text:
+            return found
+        text = self._fold(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index, length in output[state]:
+                if index in found:
+                    continue
+                if self.whole_words:
+                    start = end - length
+                    if start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if end < len(text) and _is_word_char(text[end]):
+                        continue
+                found.add(index)
+        return found
+
+    def match(self, fields):
+        """
+        Match the keywords against named text fields
+        Returns (keywords, matched_fields): the keywords found in any field,
+        in the order they were given, and {keyword: [field names]}
+        """
+        matched_fields = {}
+        for name, text in fields.items():
+            if not isinstance(text, str):
+                continue
+            for index in self.search(text):
+                matched_fields.setdefault(self.keywords[index], []).append(name)
+
+        keywords = [keyword for keyword in self.keywords if keyword in matched_fields]
+        return keywords, matched_fields
@@ -0,0 +1,395 @@
+"""
+Post store for the backend server
+Keeps scraped posts keyed by post ID, in date order (newest first),
+optionally persisted to SQLite
+"""
+
+import json
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from timestamps import post_timestamp
+
+ENGAGEMENT_FIELDS = ("likes", "comments", "shares")
+
+
+class SortedIndex:
+    """
+    Sorted list of keys split into chunks of at most 2 * chunk_size keys, so
+    that an insert or a removal costs a binary search and a shift within one
+    chunk instead of a shift of the whole list
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+        self._chunks = []
+        self._maxes = []
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield from chunk
+
+    def _locate(self, key):
+        return min(bisect_left(self._maxes, key), len(self._chunks) - 1)
+
+    def add(self, key):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+
+        i = self._locate(key)
+        chunk = self._chunks[i]
+        insort(chunk, key)
+        self._maxes[i] = chunk[-1]
+        self._len += 1
+
+        if len(chunk) > 2 * self.chunk_size:
+            self._chunks[i : i + 1] = [
+                chunk[: self.chunk_size],
+                chunk[self.chunk_size :],
+            ]
+            self._maxes[i : i + 1] = [chunk[self.chunk_size - 1], chunk[-1]]
+
+    def remove(self, key):
+        i = self._locate(key)
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, key)
+        if j == len(chunk) or chunk[j] != key:
+            raise KeyError(key)
+        del chunk[j]
+        self._len -= 1
+
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def bisect_right(self, key):
+        """Number of keys lower than or equal to key"""
+        i = bisect_right(self._maxes, key)
+        position = sum(len(chunk) for chunk in self._chunks[:i])
+        if i < len(self._chunks):
+            position += bisect_right(self._chunks[i], key)
+        return position
+
+    def slice(self, start, stop):
+        """Keys from position start (included) to stop (excluded)"""
+        keys = []
+        position = 0
+        for chunk in self._chunks:
+            if position + len(chunk) <= start:
+                position += len(chunk)
+                continue
+            keys.extend(chunk[max(start - position, 0) : stop - position])
+            position += len(chunk)
+            if position >= stop:
+                break
+        return keys
+
+    def clear(self):
+        self._chunks = []
+        self._maxes = []
+        self._len = 0
+
+
+class PostStore:
+    """
+    Scraped posts keyed by post ID, with a date index sorted newest first.
+
+    Polling the same offsets again returns posts we already have: those are
+    merged into the stored post (fresh engagement counts, union of the
+    matched keywords) instead of being appended again.
+
+    Every post added or changed gets the next version number, so that clients
+    can ask for what changed since the version they last saw.
+
+    With a path, posts are persisted to SQLite (WAL mode), one transaction
+    per extend() call. On startup only the (id, date, version) index is
+    loaded, in a background thread; reads are answered from SQLite until it
+    is ready, and post bodies are read from SQLite the first time they are
+    needed.
+    """
+
+    LOAD_BATCH_SIZE = 50000
+    READ_BATCH_SIZE = 500
+
+    def __init__(self, path=None, chunk_size=1000):
+        self.path = path
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._posts = {}
+        self._keys = {}
+        self._index = SortedIndex(chunk_size)
+        self._versions = {}
+        self._version_index = SortedIndex(chunk_size)
+        self.version = 0
+        self.cleared_version = 0
+        self._loaded = threading.Event()
+        self._conn = None
+
+        if not path:
+            self._loaded.set()
+            return
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS posts (id TEXT PRIMARY KEY, "
+            "sort_key INTEGER NOT NULL, data TEXT NOT NULL, version INTEGER)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(posts)")]
+        if "version" not in columns:
+            self._conn.execute("ALTER TABLE posts ADD COLUMN version INTEGER")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS posts_sort_key ON posts (sort_key DESC, id)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.commit()
+        self.version = self.get_meta("version", 0)
+        self.cleared_version = self.get_meta("cleared_version", 0)
+        threading.Thread(target=self._load_index, daemon=True).start()
+
+    def _load_index(self):
+        """Load the (id, date, version) index from SQLite, without the post
+        bodies"""
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute("SELECT id, sort_key, version FROM posts")
+            while True:
+                rows = cursor.fetchmany(self.LOAD_BATCH_SIZE)
+                if not rows:
+                    break
+                with self._lock:
+                    for post_id, sort_key, version in rows:
+                        key = (-int(sort_key), post_id)
+                        self._keys[post_id] = key
+                        self._index.add(key)
+                        self._versions[post_id] = version or 0
+                        self._version_index.add((version or 0, post_id))
+        finally:
+            conn.close()
+            self._loaded.set()
+
+    def _read(self, post_ids):
+        """Make sure the given posts are in memory"""
+        missing = [post_id for post_id in post_ids if post_id not in self._posts]
+        for i in range(0, len(missing), self.READ_BATCH_SIZE):
+            batch = missing[i : i + self.READ_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT id, data FROM posts WHERE id IN ({placeholders})", batch
+            ).fetchall()
+            for post_id, data in rows:
+                self._posts[post_id] = json.loads(data)
+
+    def __len__(self):
+        if not self._loaded.is_set():
+            with self._lock:
+                return self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self.list())
+
+    def get(self, post_id):
+        post_id = str(post_id)
+        with self._lock:
+            if self._conn is not None:
+                self._read([post_id])
+            return self._posts.get(post_id)
+
+    @staticmethod
+    def _merge(existing, post):
+        merged = dict(existing)
+        for key, value in post.items():
+            if key in ENGAGEMENT_FIELDS:
+                merged[key] = value
+            elif key == "keywords":
+                merged[key] = list(dict.fromkeys((existing.get(key) or []) + value))
+            elif value and not existing.get(key):
+                merged[key] = value
+        return merged
+
+    def _upsert(self, post):
+        """Returns the SQLite row to write, or None if the post didn't change"""
+        post_id = str(post.get("id"))
+        existing = self._posts.get(post_id)
+        if existing is not None:
+            post = self._merge(existing, post)
+            if post == existing:
+                return None
+        key = (-post_timestamp(post), post_id)
+
+        old_key = self._keys.get(post_id)
+        if old_key != key:
+            if old_key is not None:
+                self._index.remove(old_key)
+            self._index.add(key)
+            self._keys[post_id] = key
+
+        self.version += 1
+        old_version = self._versions.get(post_id)
+        if old_version is not None:
+            self._version_index.remove((old_version, post_id))
+        self._versions[post_id] = self.version
+        self._version_index.add((self.version, post_id))
+
+        self._posts[post_id] = post
+        return (post_id, -key[0], json.dumps(post), self.version)
+
+    def upsert(self, post):
+        """Add a post, or merge it into the stored post with the same ID.
+        Returns True if the post was new"""
+        added, _ = self.extend([post])
+        return added == 1
+
+    def extend(self, posts, meta=None):
+        """Upsert many posts and set meta values, in a single transaction.
+        Returns the number of (added, updated) posts; posts that didn't
+        change count as neither"""
+        self._loaded.wait()
+        added = updated = 0
+        rows = []
+        with self._lock:
+            if self._conn is not None:
+                # one query for all the stored posts we are about to merge into
+                post_ids = (str(post.get("id")) for post in posts)
+                self._read([post_id for post_id in post_ids if post_id in self._keys])
+            for post in posts:
+                is_new = str(post.get("id")) not in self._keys
+                row = self._upsert(post)
+                if row is None:
+                    continue
+                rows.append(row)
+                if is_new:
+                    added += 1
+                else:
+                    updated += 1
+
+            if self._conn is not None:
+                meta = dict(meta or {}, version=self.version)
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?)", rows
+                    )
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                        [(k, json.dumps(v)) for k, v in meta.items()],
+                    )
+            if rows:
+                self._changed.notify_all()
+        return added, updated
+
+    def wait_for_change(self, version, timeout=None):
+        """Block until the store version is past version, or timeout seconds.
+        Returns True if it is"""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.version > version, timeout)
+
+    def get_meta(self, key, default=None):
+        """Value persisted with set_meta() or extend(meta=...)"""
+        if self._conn is None:
+            return default
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        if self._conn is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+    def list(self, start=0, stop=None):
+        """Posts sorted by date, newest first"""
+        with self._lock:
+            if not self._loaded.is_set():
+                # still loading the index: let SQLite sort
+                rows = self._conn.execute(
+                    "SELECT data FROM posts ORDER BY sort_key DESC, id "
+                    "LIMIT ? OFFSET ?",
+                    (-1 if stop is None else max(stop - start, 0), start),
+                ).fetchall()
+                return [json.loads(data) for (data,) in rows]
+
+            if stop is None:
+                stop = len(self._index)
+            post_ids = [post_id for _, post_id in self._index.slice(start, stop)]
+            return self._bodies(post_ids)
+
+    def _bodies(self, post_ids):
+        if self._conn is not None:
+            self._read(post_ids)
+        return [self._posts[post_id] for post_id in post_ids]
+
+    def page(self, limit, cursor=None):
+        """Up to limit posts sorted by date, newest first, starting after the
+        post a cursor points to. Returns the posts and the cursor of the last
+        one, or None at the end. Inserts don't shift pages, unlike offsets"""
+        self._loaded.wait()
+        with self._lock:
+            start = self._index.bisect_right(cursor) if cursor is not None else 0
+            keys = self._index.slice(start, start + limit)
+            posts = self._bodies([post_id for _, post_id in keys])
+            more = start + len(keys) < len(self._index)
+            return posts, (keys[-1] if keys and more else None)
+
+    def changed_since(self, version, limit=None):
+        """Posts added or changed after a version, oldest change first.
+        Returns the posts and the version of the last one"""
+        self._loaded.wait()
+        with self._lock:
+            # (version + 1,) sorts after every (version, post_id) entry
+            start = self._version_index.bisect_right((version + 1,))
+            stop = len(self._version_index) if limit is None else start + limit
+            entries = self._version_index.slice(start, stop)
+            posts = self._bodies([post_id for _, post_id in entries])
+            return posts, (entries[-1][0] if entries else max(version, 0))
+
+    def batches(self, batch_size):
+        """Posts sorted by date, newest first, batch_size at a time"""
+        for start in range(0, len(self), batch_size):
+            batch = self.list(start, start + batch_size)
+            if not batch:
+                return
+            yield batch
+
+    def clear(self):
+        """Remove every post and meta value. Versions keep counting up, so
+        that clients can tell they have to start over"""
+        self._loaded.wait()
+        with self._lock:
+            self._posts = {}
+            self._keys = {}
+            self._index.clear()
+            self._versions = {}
+            self._version_index.clear()
+            self.version += 1
+            self.cleared_version = self.version
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM posts")
+                    self._conn.execute("DELETE FROM meta")
+                    self._conn.executemany(
+                        "INSERT INTO meta VALUES (?, ?)",
+                        [
+                            ("version", json.dumps(self.version)),
+                            ("cleared_version", json.dumps(self.cleared_version)),
+                        ],
+                    )
+            self._changed.notify_all()
@@ -0,0 +1,115 @@
+"""
+Replay archived keyword searches through the current extraction
+Rebuilds the posts of the content searches kept in the client's response
+archive (ARCHIVE_DIR) with today's field extraction and keyword matching, and
+merges them into the post store, so that an extraction fix doesn't need a
+re-crawl. Stop the server first: it keeps the post index in memory
+
+    python reextract.py [ARCHIVE_DIR] [--since UNIX_TIME] [--keywords K ...]
+
+Searches are matched against the keywords of their own query, split on
+spaces: pass --keywords to match multi-word keywords
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from urllib.parse import unquote
+
+import server
+from keyword_matcher import KeywordMatcher
+
+try:
+    from linkedin_api.linkedin import ResponseArchive, parse_search_results
+except ImportError:
+    ResponseArchive = parse_search_results = None
+
+SEARCH_ENDPOINT = "graphql:voyagerSearchDashClusters"
+CONTENT_FILTER = "(key:resultType,value:List(CONTENT))"
+QUERY_KEYWORDS_RE = re.compile(r"keywords:(.*?),flagshipSearchIntent")
+
+
+def archived_keywords(url):
+    """Keywords of an archived search: the words of its query"""
+    match = QUERY_KEYWORDS_RE.search(unquote(url))
+    return match.group(1).split() if match else []
+
+
+def reextract_searches(
+    archive, keywords=None, since=None, whole_words=False, case_sensitive=False
+):
+    """
+    Build the posts of every archived content search again and merge them
+    into the post store, each search with the time it was fetched at
+    Returns (searches, added, updated)
+    """
+    matcher = None
+    if keywords:
+        matcher = KeywordMatcher(
+            keywords, whole_words=whole_words, case_sensitive=case_sensitive
+        )
+
+    searches = added = updated = 0
+    for entry in archive.entries(endpoints=[SEARCH_ENDPOINT], since=since):
+        if entry["status"] != 200 or CONTENT_FILTER not in unquote(entry["url"]):
+            continue
+        try:
+            data = json.loads(archive.read(entry))
+        except ValueError as e:
+            print(f"⚠️ Unreadable response for {entry['url']}: {e}")
+            continue
+
+        search_matcher = matcher or KeywordMatcher(
+            archived_keywords(entry["url"]),
+            whole_words=whole_words,
+            case_sensitive=case_sensitive,
+        )
+        if not search_matcher:
+            continue
+        posts = server.build_posts(
+            parse_search_results(data),
+            search_matcher,
+            searched_at=datetime.fromtimestamp(entry["fetched_at"]),
+        )
+        search_added, search_updated = server.scraped_posts.extend(posts)
+        searches += 1
+        added += search_added
+        updated += search_updated
+
+    return searches, added, updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay archived keyword searches into the post store"
+    )
+    parser.add_argument("archive", nargs="?", default=server.ARCHIVE_DIR)
+    parser.add_argument("--since", type=float, help="Unix time of the oldest search")
+    parser.add_argument("--keywords", nargs="+", help="Match these keywords instead")
+    parser.add_argument("--whole-words", action="store_true")
+    parser.add_argument("--case-sensitive", action="store_true")
+    args = parser.parse_args(argv)
+
+    if ResponseArchive is None:
+        print("❌ The patched linkedin-api is needed: run `npm run copy-lib`")
+        return 1
+    if not args.archive or not os.path.isdir(args.archive):
+        print("❌ No archive: pass its directory or set ARCHIVE_DIR")
+        return 1
+
+    searches, added, updated = reextract_searches(
+        ResponseArchive(args.archive),
+        keywords=args.keywords,
+        since=args.since,
+        whole_words=args.whole_words,
+        case_sensitive=args.case_sensitive,
+    )
+    print(f"✅ Replayed {searches} searches: added {added} posts, updated {updated}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
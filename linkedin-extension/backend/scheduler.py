@@ -0,0 +1,151 @@
+"""
+Polling scheduler for the backend server
+Runs keyword subscriptions on their own interval, persisted to a JSON file
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MIN_INTERVAL_SECONDS = 60
+
+
+class SubscriptionScheduler:
+    """
+    Keyword subscriptions, each run every `interval` seconds on a small
+    worker pool.
+
+    - A subscription never runs twice at the same time: a run that is still
+      going when the next one is due delays it.
+    - Runs start at least `min_start_gap` seconds apart, whatever their
+      number, so that they share the request rate instead of bursting (e.g.
+      every subscription being due at once after a restart). It may be a
+      function, called before each start, to follow the request rate.
+    - New subscriptions start after a random delay, so that subscriptions
+      with the same interval don't stay in lockstep.
+    """
+
+    def __init__(self, run, path=None, max_workers=2, min_start_gap=10):
+        self.run = run
+        self.path = path
+        self.min_start_gap = min_start_gap
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._cond = threading.Condition()
+        self._subscriptions = {}
+        self._running = set()
+        self._last_start = 0.0
+        self._thread = None
+        self._stopped = False
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for subscription in json.load(f):
+                    self._subscriptions[subscription["id"]] = subscription
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(list(self._subscriptions.values()), f)
+        os.replace(tmp_path, self.path)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def list(self):
+        with self._cond:
+            return [
+                dict(subscription, running=subscription["id"] in self._running)
+                for subscription in self._subscriptions.values()
+            ]
+
+    def create(self, keywords, interval, time_range=None):
+        interval = max(int(interval), MIN_INTERVAL_SECONDS)
+        now = time.time()
+        subscription = {
+            "id": uuid.uuid4().hex,
+            "keywords": keywords,
+            "interval": interval,
+            "timeRange": time_range,
+            "createdAt": now,
+            "nextRunAt": now + random.uniform(0, min(interval, MIN_INTERVAL_SECONDS)),
+            "lastRunAt": None,
+            "lastResult": None,
+            "lastError": None,
+        }
+        with self._cond:
+            self._subscriptions[subscription["id"]] = subscription
+            self._save()
+            self._cond.notify_all()
+        return dict(subscription)
+
+    def delete(self, subscription_id):
+        """Remove a subscription. A run in progress is left to finish"""
+        with self._cond:
+            if self._subscriptions.pop(subscription_id, None) is None:
+                return False
+            self._save()
+            return True
+
+    def _loop(self):
+        with self._cond:
+            while not self._stopped:
+                now = time.time()
+                waiting = [
+                    s
+                    for s in self._subscriptions.values()
+                    if s["id"] not in self._running
+                ]
+                due = [s for s in waiting if s["nextRunAt"] <= now]
+                gap = self.min_start_gap
+                next_start = self._last_start + (gap() if callable(gap) else gap)
+
+                if due and now >= next_start:
+                    subscription = min(due, key=lambda s: s["nextRunAt"])
+                    self._running.add(subscription["id"])
+                    self._last_start = now
+                    self._pool.submit(self._run, subscription["id"])
+                    continue
+
+                timeout = 30
+                if due:
+                    timeout = next_start - now
+                elif waiting:
+                    next_run = min(s["nextRunAt"] for s in waiting)
+                    timeout = min(max(next_run, next_start) - now, timeout)
+                self._cond.wait(timeout=max(timeout, 0.05))
+
+    def _run(self, subscription_id):
+        with self._cond:
+            subscription = dict(self._subscriptions.get(subscription_id) or {})
+        started_at = time.time()
+        result = error = None
+        if subscription:
+            try:
+                result = self.run(subscription)
+            except Exception as e:
+                error = str(e)
+                print(f"⚠️ Subscription {subscription_id} failed: {error}")
+
+        with self._cond:
+            self._running.discard(subscription_id)
+            stored = self._subscriptions.get(subscription_id)
+            if stored is not None:
+                stored["lastRunAt"] = started_at
+                stored["lastResult"] = result
+                stored["lastError"] = error
+                stored["nextRunAt"] = started_at + stored["interval"]
+                self._save()
+            self._cond.notify_all()
@@ -3,11 +3,24 @@ LinkedIn Scraper Backend Server
 Uses linkedin-api library to login and scrape posts
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
+import base64
 import json
+import math
 import os
-from datetime import datetime, timedelta
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+
+from extraction import search_result_extractor
+from keyword_matcher import KeywordMatcher
+from post_store import PostStore
+from scheduler import SubscriptionScheduler
+from timestamps import parse_relative_time, urn_datetime, urn_timestamp
 
 try:
     from linkedin_api import Linkedin
@@ -18,76 +31,52 @@ except ImportError as e:
     LINKEDIN_API_AVAILABLE = False
     Linkedin = None
 
+try:
+    from linkedin_api.linkedin import export_records
+except ImportError:
+    export_records = None
+
+try:
+    from linkedin_api.linkedin import ResponseArchive
+except ImportError:
+    ResponseArchive = None
+
 app = Flask(__name__)
 CORS(app)
 
-scraped_posts = []
+# Set POSTS_DB_PATH to an empty string to keep posts in memory only
+POSTS_DB_PATH = os.environ.get(
+    "POSTS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraped_posts.db"),
+)
 
-linkedin_api = None
+scraped_posts = PostStore(POSTS_DB_PATH or None)
 
-last_poll_timestamp = None
+# /export_posts writes here, never to a path sent by the client
+EXPORTS_DIR = os.environ.get(
+    "EXPORTS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "exports"),
+)
+EXPORT_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
 
+# Set ARCHIVE_DIR to keep the raw responses of the client, so that searches
+# can be extracted again after a fix (see reextract.py) instead of re-crawled
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR")
 
-def parse_relative_time(time_str):
-    """Parse relative time strings like '1w', '20h', '1d', '1y' into datetime"""
-    if not time_str or not isinstance(time_str, str):
-        return None
-
-    time_str = time_str.strip().lower()
+linkedin_api = None
 
-    time_str = (
-        time_str.replace("•", "")
-        .replace(" ", "")
-        .replace("visibletoeveryone", "")
-        .strip()
-    )
+last_poll_timestamp = scraped_posts.get_meta("last_poll_timestamp")
 
-    try:
-        import re
-
-        match = re.match(r"(\d+)([a-z]+)", time_str)
-        if not match:
-            return None
-
-        number = int(match.group(1))
-        unit = match.group(2)
-
-        now = datetime.now()
-
-        if unit in ["h", "hr", "hrs", "hour", "hours"]:
-            return now - timedelta(hours=number)
-        elif unit in ["d", "day", "days"]:
-            return now - timedelta(days=number)
-        elif unit in ["w", "wk", "week", "weeks"]:
-            return now - timedelta(weeks=number)
-        elif unit in ["m", "mo", "month", "months"]:
-            return now - timedelta(days=number * 30)
-        elif unit in ["y", "yr", "year", "years"]:
-            return now - timedelta(days=number * 365)
-        else:
-            return None
-    except Exception as e:
-        print(f"   ⚠️ Could not parse relative time '{time_str}': {e}")
-        return None
+# /stream_posts: each stream holds a server thread, so their number is capped
+MAX_STREAM_CLIENTS = 20
+STREAM_BATCH_SIZE = 50
 
+# Threads of the fan-out searches when the client can't run them itself
+FAN_OUT_WORKERS = 4
+STREAM_KEEPALIVE_SECONDS = 15
 
-def get_post_date(post):
-    """Helper function to extract date from post for sorting"""
-    date_str = (
-        post.get("createdAt")
-        or post.get("created")
-        or post.get("time")
-        or post.get("scrapedAt", "")
-    )
-    if not date_str:
-        return datetime.min
-    try:
-        if isinstance(date_str, str):
-            date_str = date_str.split("+")[0].split("Z")[0]
-            return datetime.fromisoformat(date_str.replace("T", " "))
-    except:
-        pass
-    return datetime.min
+stream_clients = 0
+stream_clients_lock = threading.Lock()
 
 
 def filter_posts_only(search_results):
@@ -148,6 +137,86 @@ def filter_posts_only(search_results):
     return posts_only
 
 
+# Voyager's datePosted values, by the number of days they cover
+DATE_POSTED_FILTERS = ((1, "past-24h"), (7, "past-week"), (30, "past-month"))
+
+
+def content_search_filters(days_back=None):
+    """
+    Filters of a content search. With days_back, restrict it to the smallest
+    datePosted window covering the last days_back days, newest posts first
+    """
+    filters = ["(key:resultType,value:List(CONTENT))"]
+    if days_back:
+        for max_days, date_posted in DATE_POSTED_FILTERS:
+            if days_back <= max_days:
+                filters.append(f"(key:datePosted,value:List({date_posted}))")
+                break
+        filters.append("(key:sortBy,value:List(date_posted))")
+    return "List({})".format(",".join(filters))
+
+
+def search_result_urns(result):
+    """URNs of a raw search result, the one identifying the post first"""
+    urns = []
+    update = result.get("update")
+    if isinstance(update, dict):
+        metadata = update.get("metadata")
+        if isinstance(metadata, dict):
+            urns += [metadata.get("backendUrn"), metadata.get("shareUrn")]
+        urns.append(update.get("entityUrn"))
+    urns += [result.get("trackingUrn"), result.get("entityUrn")]
+    return [urn for urn in urns if urn and isinstance(urn, str)]
+
+
+def search_result_timestamp(result):
+    """Creation time (epoch ms) of a raw search result from its URNs, None if unknown"""
+    for urn in search_result_urns(result):
+        timestamp = urn_timestamp(urn)
+        if timestamp is not None:
+            return timestamp
+    return None
+
+
+def is_older_than(result, window_start):
+    """Whether a raw search result was created before window_start (epoch ms)"""
+    if window_start is None or not isinstance(result, dict):
+        return False
+    timestamp = search_result_timestamp(result)
+    return timestamp is not None and timestamp < window_start
+
+
+def fetch_content_search(query, limit, offset, window_start=None, days_back=None):
+    """
+    Run a content search, page by page
+    Returns (raw_results, in_window): all the results fetched, and those not
+    older than window_start (epoch ms)
+    """
+    search_params = {
+        "keywords": query,
+        "filters": content_search_filters(days_back),
+    }
+    if hasattr(linkedin_api, "iter_search"):
+        pages = linkedin_api.iter_search(search_params, limit=limit, offset=offset)
+    else:
+        pages = [linkedin_api.search(search_params, limit=limit, offset=offset)]
+
+    raw_results = []
+    in_window = []
+    # Results are sorted newest first: once a whole page is older than the
+    # time range, the next ones are too
+    for page in pages:
+        raw_results.extend(page)
+        page_in_window = [
+            result for result in page if not is_older_than(result, window_start)
+        ]
+        in_window.extend(page_in_window)
+        if page and not page_in_window:
+            print(f"   📅 '{query}': reached posts older than the time range")
+            break
+    return raw_results, in_window
+
+
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint"""
@@ -181,7 +250,12 @@ def login():
                 400,
             )
 
-        linkedin_api = Linkedin(email, password)
+        if ARCHIVE_DIR and ResponseArchive is not None:
+            linkedin_api = Linkedin(
+                email, password, archive=ResponseArchive(ARCHIVE_DIR)
+            )
+        else:
+            linkedin_api = Linkedin(email, password)
 
         try:
             profile = {
@@ -227,7 +301,163 @@ def login():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-def search_posts_by_keywords(keywords, limit=50, offset=0, days_back=30):
+def build_posts(search_results, matcher, searched_at=None):
+    """
+    Turn raw search results into posts: extract their fields, and keep those
+    matching the keywords of matcher. Also used to replay archived searches
+    (see reextract.py)
+    """
+    searched_at = searched_at or datetime.now()
+    posts = []
+    results = []
+    for result in search_results:
+        if not result or not isinstance(result, dict):
+            continue
+        if "update" in result and not result.get("update"):
+            continue
+        results.append(result)
+
+    extracted = search_result_extractor.extract_many(results)
+    for result, fields in zip(results, extracted):
+        is_search_update_wrapper = "update" in result
+        tracking_urn = fields["urn"]
+
+        post_id = None
+        if ":" in tracking_urn:
+            post_id = tracking_urn.split(":")[-1]
+        if not post_id:
+            post_id = fields["id"] or str(result)
+        post_id_str = str(post_id)
+
+        template = fields["template"]
+        is_job_posting = "job" in tracking_urn.lower() or (
+            template == "UNIVERSAL" and bool(fields["title"])
+        )
+
+        post_text = fields["text"]
+        if is_job_posting and fields["title"]:
+            post_text = fields["title"]
+            if fields["primarySubtitle"]:
+                post_text += f" at {fields['primarySubtitle']}"
+            if fields["secondarySubtitle"]:
+                post_text += f" - {fields['secondarySubtitle']}"
+
+        author_name = fields["actorName"]
+        if is_job_posting and not author_name:
+            author_name = fields["primarySubtitle"]
+        author_name = author_name or fields["authorName"]
+
+        company_name = fields["companyName"]
+        company_urn = fields["companyUrn"]
+        if is_job_posting:
+            company_name = (
+                company_name or fields["primarySubtitle"] or fields["logoCompanyName"]
+            )
+            company_urn = company_urn or fields["logoCompanyUrn"]
+        company_name = company_name or fields["embeddedCompanyName"]
+        company_urn = company_urn or fields["embeddedCompanyUrn"]
+
+        matching_keywords, matched_fields = matcher.match(
+            {
+                "text": post_text,
+                "authorName": author_name,
+                "companyName": company_name,
+            }
+        )
+        if not matching_keywords:
+            continue
+
+        relative_time_str = fields["relativeTime"]
+
+        # Exact when the URN carries the creation time, else the
+        # relative time ("3w") is only a rough estimate
+        post_created_at = ""
+        created_at = urn_datetime(tracking_urn) or urn_datetime(fields["entityUrn"])
+        if created_at:
+            post_created_at = created_at.isoformat()
+        parsed_relative_time = None
+        if not post_created_at:
+            parsed_relative_time = parse_relative_time(
+                relative_time_str, now=searched_at
+            )
+        if is_search_update_wrapper and parsed_relative_time:
+            post_created_at = parsed_relative_time.isoformat()
+        if not post_created_at:
+            post_created_at = fields["createdAt"]
+        if is_job_posting and not post_created_at and fields["jobPostedAt"]:
+            try:
+                post_created_at = datetime.fromtimestamp(
+                    fields["jobPostedAt"] / 1000
+                ).isoformat()
+            except:
+                pass
+        if parsed_relative_time and not post_created_at:
+            post_created_at = parsed_relative_time.isoformat()
+            print(
+                f"   📅 Parsed relative time '{relative_time_str}' -> {post_created_at}"
+            )
+
+        post_url = fields["url"]
+        if not post_url and tracking_urn:
+            if tracking_urn.startswith("urn:li:activity:"):
+                post_url = f"https://www.linkedin.com/feed/update/{tracking_urn}"
+            elif "activity:" in tracking_urn:
+                activity_id = tracking_urn.split(":")[-1]
+                post_url = f"https://www.linkedin.com/feed/update/urn:li:activity:{activity_id}"
+            elif tracking_urn.startswith("urn:li:job:"):
+                job_id = tracking_urn.split(":")[-1]
+                post_url = f"https://www.linkedin.com/jobs/view/{job_id}/"
+
+        post_type = fields["type"] or template or "standard"
+        if is_job_posting:
+            post_type = "JOB_POSTING"
+        elif is_search_update_wrapper:
+            post_type = "POST"
+
+        post_data = {
+            "id": post_id_str,
+            "urn": tracking_urn,
+            "text": post_text,
+            "textPreview": post_text[:200],
+            "keywords": matching_keywords,
+            "matchedFields": matched_fields,
+            "scrapedAt": searched_at.isoformat(),
+            "authorName": author_name,
+            "authorUrn": fields["authorUrn"],
+            "authorProfileUrl": fields["authorProfileUrl"],
+            "createdAt": post_created_at,
+            "updatedAt": fields["updatedAt"],
+            "likes": fields["likes"],
+            "comments": fields["comments"],
+            "shares": fields["shares"],
+            "url": post_url,
+            "postType": post_type,
+            "visibility": fields["visibility"],
+            "language": fields["language"],
+            "entityUrn": fields["entityUrn"],
+            "trackingId": fields["trackingId"],
+            "template": template,
+            "companyName": company_name,
+            "companyUrn": company_urn,
+            "relativeTime": relative_time_str,
+        }
+
+        if fields["media"]:
+            post_data["media"] = fields["media"][:5]
+
+        posts.append(post_data)
+    return posts
+
+
+def search_posts_by_keywords(
+    keywords,
+    limit=50,
+    offset=0,
+    days_back=30,
+    whole_words=False,
+    case_sensitive=False,
+    fan_out=False,
+):
     """
     Internal function to search for posts by keywords
     Returns tuple: (processed_posts, raw_search_results)
@@ -238,7 +468,12 @@ def search_posts_by_keywords(keywords, limit=50, offset=0, days_back=30):
         keywords: List of keywords to search for
         limit: Number of posts to fetch per keyword (default: 50)
         offset: Pagination offset for different batches (default: 0)
-        days_back: Only fetch posts from the last N days (default: 30) - used for API-level filtering
+        days_back: Only fetch posts from the last N days (default: 30) - sent as a
+            datePosted filter, and older posts are dropped (0 or None: no limit)
+        whole_words: Only match keywords as whole words (default: False)
+        case_sensitive: Match keywords case sensitively (default: False)
+        fan_out: Run one search per keyword, concurrently, instead of a single
+            search for all the keywords (default: False)
     """
     global linkedin_api
 
@@ -248,6 +483,11 @@ def search_posts_by_keywords(keywords, limit=50, offset=0, days_back=30):
     if not keywords:
         raise Exception("Keywords are required")
 
+    # Built once per poll, then run over the extracted fields of every post
+    matcher = KeywordMatcher(
+        keywords, whole_words=whole_words, case_sensitive=case_sensitive
+    )
+
     all_posts = []
     all_raw_results = []
 
@@ -255,656 +495,67 @@ def search_posts_by_keywords(keywords, limit=50, offset=0, days_back=30):
     print(f"📅 API-level date filtering: last {days_back} days")
     print(f"🔍 Searching for keywords: {', '.join(keywords)}")
 
-    try:
-        if hasattr(linkedin_api, "search"):
+    # Posts created before this (epoch ms) are out of the time range
+    window_start = (time.time() - days_back * 86400) * 1000 if days_back else None
 
-            try:
-                search_params = {
-                    "keywords": " ".join(keywords),
-                    "filters": "List((key:resultType,value:List(CONTENT)))",
-                }
-                search_results = linkedin_api.search(
-                    search_params, limit=50, offset=offset
-                )
-                if search_results:
-                    all_raw_results.extend(search_results)
-                    print(f"   🔍 All raw results: {len(all_raw_results)}")
+    # One query for all the keywords, or with fan_out one per keyword, sent
+    # concurrently through the client (and its shared rate limiter). The stock
+    # linkedin-api client has no run_concurrently(): the searches then run on
+    # a local pool of FAN_OUT_WORKERS threads, without a shared rate limiter
+    if fan_out:
+        queries = list(dict.fromkeys(str(keyword) for keyword in keywords))
+    else:
+        queries = [" ".join(keywords)]
 
-            except Exception as search_error:
-                print(f"   ⚠️ search() with filters failed: {str(search_error)}")
-                search_results = None
-
-        if search_results:
-            for result in search_results:
-                if not result:
-                    continue
+    def search(query):
+        return fetch_content_search(query, limit, offset, window_start, days_back)
 
-                is_search_update_wrapper = False
-                update_data = result
-
-                if isinstance(result, dict) and "update" in result:
-                    is_search_update_wrapper = True
-                    update_data = result.get("update", {})
-                    if not update_data:
-                        continue
-
-                actor_nav_for_urn = update_data.get("actorNavigationContext")
-                actor_nav_urn_dict = (
-                    actor_nav_for_urn if isinstance(actor_nav_for_urn, dict) else {}
-                )
-
-                if is_search_update_wrapper:
-                    metadata = update_data.get("metadata", {})
-                    tracking_urn = (
-                        metadata.get("backendUrn", "")
-                        or metadata.get("shareUrn", "")
-                        or update_data.get("entityUrn", "")
-                        or result.get("trackingUrn", "")
-                    )
-                else:
-                    tracking_urn = (
-                        update_data.get("trackingUrn")
-                        or update_data.get("dashEntityUrn")
-                        or update_data.get("entityUrn")
-                        or update_data.get("urn")
-                        or actor_nav_urn_dict.get("trackingUrn", "")
-                        or actor_nav_urn_dict.get("entityUrn", "")
-                    )
-
-                post_id = None
-                if tracking_urn:
-                    if isinstance(tracking_urn, str) and ":" in tracking_urn:
-                        parts = tracking_urn.split(":")
-                        if len(parts) > 0:
-                            post_id = parts[-1]
-
-                if not post_id:
-                    post_id = update_data.get("id") or result.get("id") or str(result)
-
-                post_id_str = str(post_id)
-
-                post_text = ""
-
-                commentary = update_data.get("commentary", {})
-                if isinstance(commentary, dict):
-                    if "text" in commentary:
-                        text_value = commentary["text"]
-                        if isinstance(text_value, dict):
-                            post_text = text_value.get("text", "")
-                        elif isinstance(text_value, str):
-                            post_text = text_value
-                        else:
-                            post_text = str(text_value)
-
-                if not post_text:
-                    summary = update_data.get("summary", {})
-                    if isinstance(summary, dict):
-                        summary_text = summary.get("text", "")
-                        if summary_text:
-                            post_text = summary_text
-
-                if not post_text:
-                    actor_nav = update_data.get("actorNavigationContext", {})
-                    if isinstance(actor_nav, dict):
-                        summary = actor_nav.get("summary", {})
-                        if isinstance(summary, dict):
-                            summary_text = summary.get("text", "")
-                            if summary_text:
-                                post_text = summary_text
-
-                if not post_text:
-                    text_fields = [
-                        update_data.get("text"),
-                        update_data.get("description"),
-                        update_data.get("content"),
-                    ]
-                    for field_value in text_fields:
-                        if field_value:
-                            if isinstance(field_value, dict):
-                                post_text = field_value.get("text", "") or json.dumps(
-                                    field_value, default=str
-                                )
-                            elif isinstance(field_value, str):
-                                post_text = field_value
-                            else:
-                                post_text = str(field_value)
-                            break
-
-                is_job_posting = False
-                if tracking_urn and "job" in tracking_urn.lower():
-                    is_job_posting = True
-                elif (
-                    update_data.get("template") == "UNIVERSAL"
-                    or result.get("template") == "UNIVERSAL"
-                ):
-                    title_obj = update_data.get("title", {}) or result.get("title", {})
-                    if isinstance(title_obj, dict) and title_obj.get("text"):
-                        is_job_posting = True
-
-                if is_job_posting:
-                    title_obj = update_data.get("title", {}) or result.get("title", {})
-                    if isinstance(title_obj, dict):
-                        title_text = title_obj.get("text", "")
-                        if title_text:
-                            post_text = title_text
-
-                            primary_subtitle = update_data.get(
-                                "primarySubtitle", {}
-                            ) or result.get("primarySubtitle", {})
-                            if isinstance(primary_subtitle, dict):
-                                company_text = primary_subtitle.get("text", "")
-                                if company_text:
-                                    post_text += f" at {company_text}"
-
-                            secondary_subtitle = update_data.get(
-                                "secondarySubtitle", {}
-                            ) or result.get("secondarySubtitle", {})
-                            if isinstance(secondary_subtitle, dict):
-                                location_text = secondary_subtitle.get("text", "")
-                                if location_text:
-                                    post_text += f" - {location_text}"
-
-                if not post_text:
-                    post_text = ""
-
-                post_text_lower = post_text.lower() if post_text else ""
-                result_str = (
-                    json.dumps(result, default=str).lower()
-                    if isinstance(result, dict)
-                    else str(result).lower()
+    search_results = []
+    try:
+        if len(queries) == 1:
+            try:
+                fetched = {queries[0]: (search(queries[0]), None)}
+            except Exception as search_error:
+                fetched = {queries[0]: (None, search_error)}
+        elif hasattr(linkedin_api, "run_concurrently"):
+            # in the caller's lane, e.g. background for subscriptions
+            fetched = {
+                query: (found, error)
+                for query, found, error in linkedin_api.run_concurrently(
+                    search, queries
                 )
-                if is_search_update_wrapper:
-                    update_str = (
-                        json.dumps(update_data, default=str).lower()
-                        if isinstance(update_data, dict)
-                        else str(update_data).lower()
-                    )
-                    result_str = result_str + " " + update_str
-
-                matching_keywords = []
-                for keyword in keywords:
-                    keyword_lower = (
-                        keyword.lower()
-                        if isinstance(keyword, str)
-                        else str(keyword).lower()
-                    )
-                    if keyword_lower in post_text_lower or keyword_lower in result_str:
-                        matching_keywords.append(keyword)
-
-                if matching_keywords:
-                    actor_nav_context = update_data.get("actorNavigationContext")
-                    actor_nav_dict = (
-                        actor_nav_context if isinstance(actor_nav_context, dict) else {}
-                    )
-
-                    post_created_at = ""
-                    if is_search_update_wrapper:
-                        actor = update_data.get("actor", {})
-                        if isinstance(actor, dict):
-                            sub_description = actor.get("subDescription", {})
-                            if isinstance(sub_description, dict):
-                                relative_time_str = sub_description.get(
-                                    "text", ""
-                                ) or sub_description.get("accessibilityText", "")
-                                if relative_time_str:
-                                    parsed_relative_time = parse_relative_time(
-                                        relative_time_str
-                                    )
-                                    if parsed_relative_time:
-                                        post_created_at = (
-                                            parsed_relative_time.isoformat()
-                                        )
-
-                    if not post_created_at:
-                        post_created_at = (
-                            update_data.get("createdAt")
-                            or update_data.get("created")
-                            or update_data.get("time")
-                            or update_data.get("publishedAt")
-                            or update_data.get("createdTime")
-                            or update_data.get("publishedTime")
-                            or actor_nav_dict.get("createdAt")
-                            or actor_nav_dict.get("created")
-                            or ""
-                        )
-
-                    relative_time_str = None
-                    if is_search_update_wrapper:
-                        actor = update_data.get("actor", {})
-                        if isinstance(actor, dict):
-                            sub_description = actor.get("subDescription", {})
-                            if isinstance(sub_description, dict):
-                                relative_time_str = sub_description.get(
-                                    "text", ""
-                                ) or sub_description.get("accessibilityText", "")
-                    else:
-                        secondary_subtitle = update_data.get("secondarySubtitle", {})
-                        if isinstance(secondary_subtitle, dict):
-                            relative_time_str = secondary_subtitle.get(
-                                "text", ""
-                            ) or secondary_subtitle.get("accessibilityText", "")
-
-                    if is_job_posting and not post_created_at:
-                        insights = update_data.get(
-                            "insightsResolutionResults", []
-                        ) or result.get("insightsResolutionResults", [])
-                        if insights and len(insights) > 0:
-                            job_insight = insights[0].get("jobPostingFooterInsight", {})
-                            if isinstance(job_insight, dict):
-                                footer_items = job_insight.get("footerItems", [])
-                                if footer_items and len(footer_items) > 0:
-                                    time_at = footer_items[0].get("timeAt")
-                                    if time_at:
-                                        try:
-                                            post_created_at = datetime.fromtimestamp(
-                                                time_at / 1000
-                                            ).isoformat()
-                                        except:
-                                            pass
-
-                    if relative_time_str and not post_created_at:
-                        parsed_relative_time = parse_relative_time(relative_time_str)
-                        if parsed_relative_time:
-                            post_created_at = parsed_relative_time.isoformat()
-                            print(
-                                f"   📅 Parsed relative time '{relative_time_str}' -> {post_created_at}"
-                            )
-
-                    author_name = ""
-                    author_urn = ""
-                    author_profile_url = ""
-
-                    if is_search_update_wrapper:
-                        actor = update_data.get("actor", {})
-                        if isinstance(actor, dict):
-                            name_obj = actor.get("name", {})
-                            if isinstance(name_obj, dict):
-                                author_name = name_obj.get("text", "")
-
-                            author_urn = actor.get("backendUrn", "")
-
-                            nav_context = actor.get("navigationContext", {})
-                            if isinstance(nav_context, dict):
-                                author_profile_url = nav_context.get("actionTarget", "")
-
-                    if is_job_posting and not author_name:
-                        primary_subtitle = update_data.get(
-                            "primarySubtitle", {}
-                        ) or result.get("primarySubtitle", {})
-                        if isinstance(primary_subtitle, dict):
-                            company_text = primary_subtitle.get("text", "")
-                            if company_text:
-                                author_name = company_text
-
-                    if not author_name:
-                        actor_nav = update_data.get("actorNavigationContext", {})
-                        if isinstance(actor_nav, dict):
-                            image = actor_nav.get("image", {})
-
-                            if isinstance(image, dict):
-                                author_name = image.get("accessibilityText", "")
-
-                            if not author_name:
-                                title = actor_nav.get("title", {})
-                                if isinstance(title, dict):
-                                    title_text = title.get("text", "")
-                                    if title_text:
-                                        author_name = title_text
-
-                            if not author_name and isinstance(image, dict):
-                                attributes = image.get("attributes", [])
-                                for attr in attributes:
-                                    if isinstance(attr, dict):
-                                        attr_accessibility = attr.get(
-                                            "accessibilityText", ""
-                                        )
-                                        if attr_accessibility:
-                                            author_name = attr_accessibility
-                                            break
-
-                            if not author_profile_url:
-                                author_profile_url = actor_nav.get(
-                                    "url", ""
-                                ) or actor_nav.get("actorNavigationUrl", "")
-
-                            if not author_urn:
-                                author_urn = (
-                                    actor_nav.get("entityUrn", "")
-                                    or actor_nav.get("trackingUrn", "")
-                                    or (
-                                        image.get("attributes", [{}])[0]
-                                        .get("detailData", {})
-                                        .get("nonEntityProfilePicture", {})
-                                        .get("profile", {})
-                                        .get("entityUrn", "")
-                                        if image.get("attributes")
-                                        and len(image.get("attributes", [])) > 0
-                                        else ""
-                                    )
-                                )
-
-                    if not author_name:
-                        headline = update_data.get("headline", {}) or result.get(
-                            "headline", {}
-                        )
-                        if isinstance(headline, dict):
-                            headline_text = headline.get("text", "")
-                            if headline_text:
-                                author_name = headline_text.split("•")[0].strip()
-
-                            if not author_name:
-                                attributes = headline.get("attributes", [])
-                                for attr in attributes:
-                                    if isinstance(attr, dict):
-                                        detail_data = attr.get("detailData", {})
-                                        if detail_data:
-                                            actor_name = detail_data.get(
-                                                "actorName", {}
-                                            )
-                                            if isinstance(actor_name, dict):
-                                                actor_text = actor_name.get("text", "")
-                                                if actor_text:
-                                                    author_name = actor_text
-                                                    break
-
-                                            if not author_urn:
-                                                author_urn = detail_data.get(
-                                                    "urn", ""
-                                                ) or detail_data.get("profile", "")
-
-                    if not author_name:
-                        result_image = update_data.get("image", {}) or result.get(
-                            "image", {}
-                        )
-                        if isinstance(result_image, dict):
-                            author_name = result_image.get("accessibilityText", "")
-
-                            if not author_name:
-                                accessibility_attrs = result_image.get(
-                                    "accessibilityTextAttributes", []
-                                )
-                                for attr in accessibility_attrs:
-                                    if isinstance(attr, dict) and "text" in attr:
-                                        author_name = attr.get("text", "")
-                                        break
-
-                    if is_search_update_wrapper:
-                        social_detail = update_data.get("socialDetail", {})
-                        if isinstance(social_detail, dict):
-                            total_counts = social_detail.get(
-                                "totalSocialActivityCounts", {}
-                            )
-                            if isinstance(total_counts, dict):
-                                likes = total_counts.get("numLikes", 0)
-                                comments = total_counts.get("numComments", 0)
-                                shares = total_counts.get("numShares", 0)
-                            else:
-                                likes = comments = shares = 0
-                        else:
-                            likes = comments = shares = 0
-                    else:
-                        likes = update_data.get(
-                            "numLikes",
-                            update_data.get("likes", update_data.get("likeCount", 0)),
-                        )
-                        comments = update_data.get(
-                            "numComments",
-                            update_data.get(
-                                "comments", update_data.get("commentCount", 0)
-                            ),
-                        )
-                        shares = update_data.get(
-                            "numShares",
-                            update_data.get("shares", update_data.get("shareCount", 0)),
-                        )
-
-                    post_url = ""
-                    if is_search_update_wrapper:
-                        header = update_data.get("header", {})
-                        if isinstance(header, dict):
-                            nav_context = header.get("navigationContext", {})
-                            if isinstance(nav_context, dict):
-                                post_url = nav_context.get("actionTarget", "")
-
-                        if not post_url:
-                            social_detail = update_data.get("socialDetail", {})
-                            if isinstance(social_detail, dict):
-                                post_url = social_detail.get("shareUrl", "")
-
-                        if not post_url:
-                            metadata = update_data.get("metadata", {})
-                            if isinstance(metadata, dict):
-                                backend_urn = metadata.get("backendUrn", "")
-                                if backend_urn and "activity:" in backend_urn:
-                                    activity_id = (
-                                        backend_urn.split(":")[-1]
-                                        if ":" in backend_urn
-                                        else backend_urn
-                                    )
-                                    post_url = f"https://www.linkedin.com/feed/update/urn:li:activity:{activity_id}"
-                    else:
-                        post_url = (
-                            update_data.get("navigationUrl")
-                            or update_data.get("navigationContext", {}).get("url")
-                            or update_data.get("url")
-                            or update_data.get("postUrl")
-                            or update_data.get("permalink")
-                            or ""
-                        )
-
-                    if not post_url and tracking_urn:
-                        if tracking_urn.startswith("urn:li:activity:"):
-                            post_url = (
-                                f"https://www.linkedin.com/feed/update/{tracking_urn}"
-                            )
-                        elif "activity:" in tracking_urn:
-                            activity_id = (
-                                tracking_urn.split(":")[-1]
-                                if ":" in tracking_urn
-                                else tracking_urn
-                            )
-                            post_url = f"https://www.linkedin.com/feed/update/urn:li:activity:{activity_id}"
-                        elif tracking_urn.startswith("urn:li:job:"):
-                            job_id = (
-                                tracking_urn.split(":")[-1]
-                                if ":" in tracking_urn
-                                else tracking_urn
-                            )
-                            post_url = f"https://www.linkedin.com/jobs/view/{job_id}/"
-
-                    template = update_data.get("template", "") or result.get(
-                        "template", ""
-                    )
-                    entity_urn = update_data.get("entityUrn", "") or result.get(
-                        "entityUrn", ""
-                    )
-                    tracking_id = result.get("trackingId", "") or update_data.get(
-                        "trackingId", ""
-                    )
-
-                    company_name = None
-                    company_urn = None
-
-                    if is_search_update_wrapper:
-                        metadata = update_data.get("metadata", {})
-                        if isinstance(metadata, dict):
-                            group = metadata.get("group", {})
-                            if isinstance(group, dict):
-                                company_name = group.get("name", "")
-                                company_urn = group.get("entityUrn", "")
-
-                        if not company_name:
-                            content = update_data.get("content", {})
-                            if isinstance(content, dict):
-                                entity_component = content.get("entityComponent", {})
-                                if isinstance(entity_component, dict):
-                                    subtitle = entity_component.get("subtitle", {})
-                                    if isinstance(subtitle, dict):
-                                        company_name = subtitle.get("text", "")
-
-                    if is_job_posting and not company_name:
-                        primary_subtitle = update_data.get(
-                            "primarySubtitle", {}
-                        ) or result.get("primarySubtitle", {})
-                        if isinstance(primary_subtitle, dict):
-                            company_name = primary_subtitle.get("text", "")
-
-                        image_obj = update_data.get("image", {}) or result.get(
-                            "image", {}
-                        )
-                        if isinstance(image_obj, dict):
-                            attributes = image_obj.get("attributes", [])
-                            for attr in attributes:
-                                if isinstance(attr, dict):
-                                    detail_data = attr.get("detailData", {})
-                                    if detail_data:
-                                        non_entity_company = detail_data.get(
-                                            "nonEntityCompanyLogo", {}
-                                        )
-                                        if isinstance(non_entity_company, dict):
-                                            company = non_entity_company.get(
-                                                "company", {}
-                                            )
-                                            if isinstance(company, dict):
-                                                company_urn = company.get(
-                                                    "entityUrn", ""
-                                                )
-                                                if not company_name:
-                                                    company_name = company.get(
-                                                        "name", company_name
-                                                    )
-                                                break
-
-                    if not company_name or not company_urn:
-                        entity_embedded = update_data.get(
-                            "entityEmbeddedObject", {}
-                        ) or result.get("entityEmbeddedObject", {})
-                        if isinstance(entity_embedded, dict):
-                            title_obj = entity_embedded.get("title", {})
-                            if isinstance(title_obj, dict):
-                                if not company_name:
-                                    company_name = title_obj.get("text", "")
-
-                            image_obj = entity_embedded.get("image", {})
-                            if isinstance(image_obj, dict):
-                                attributes = image_obj.get("attributes", [])
-                                for attr in attributes:
-                                    if isinstance(attr, dict):
-                                        detail_data = attr.get("detailData", {})
-                                        if detail_data:
-                                            non_entity_company = detail_data.get(
-                                                "nonEntityCompanyLogo", {}
-                                            )
-                                            if isinstance(non_entity_company, dict):
-                                                company = non_entity_company.get(
-                                                    "company", {}
-                                                )
-                                                if isinstance(company, dict):
-                                                    if not company_urn:
-                                                        company_urn = company.get(
-                                                            "entityUrn", ""
-                                                        )
-                                                    if not company_name:
-                                                        company_name = company.get(
-                                                            "name", ""
-                                                        )
-                                                    break
-
-                    media = None
-                    if is_search_update_wrapper:
-                        content = update_data.get("content", {})
-                        if isinstance(content, dict):
-                            image_component = content.get("imageComponent", {})
-                            if image_component:
-                                media = [image_component]
-                            else:
-                                entity_component = content.get("entityComponent", {})
-                                if isinstance(entity_component, dict):
-                                    entity_image = entity_component.get("image", {})
-                                    if entity_image:
-                                        media = [entity_image]
-                    else:
-                        media = update_data.get(
-                            "media",
-                            update_data.get("images", update_data.get("image", [])),
-                        )
-                        if not media:
-                            actor_images = update_data.get("actorImages", [])
-                            if actor_images:
-                                media = actor_images
-                            else:
-                                actor_nav = update_data.get(
-                                    "actorNavigationContext", {}
-                                )
-                                if isinstance(actor_nav, dict):
-                                    nav_image = actor_nav.get("image", {})
-                                    if nav_image:
-                                        media = [nav_image]
-
-                    post_type = (
-                        update_data.get("type", "")
-                        or result.get("type", "")
-                        or template
-                        or "standard"
-                    )
-                    if is_job_posting:
-                        post_type = "JOB_POSTING"
-                    elif is_search_update_wrapper:
-                        post_type = "POST"
-
-                    visibility = ""
-                    language = ""
-                    if is_search_update_wrapper:
-                        metadata = update_data.get("metadata", {})
-                        if isinstance(metadata, dict):
-                            visibility = metadata.get("shareAudience", "")
-                    else:
-                        visibility = update_data.get(
-                            "visibility", update_data.get("privacy", "")
-                        )
-                    language = update_data.get("language", "") or result.get(
-                        "language", ""
-                    )
-
-                    post_data = {
-                        "id": post_id_str,
-                        "urn": tracking_urn or "",
-                        "text": post_text,
-                        "textPreview": post_text[:200] if post_text else "",
-                        "keywords": matching_keywords,
-                        "scrapedAt": datetime.now().isoformat(),
-                        "authorName": author_name,
-                        "authorUrn": author_urn,
-                        "authorProfileUrl": author_profile_url,
-                        "createdAt": post_created_at,
-                        "updatedAt": update_data.get(
-                            "updatedAt", update_data.get("updated", "")
-                        )
-                        or result.get("updatedAt", result.get("updated", "")),
-                        "likes": likes,
-                        "comments": comments,
-                        "shares": shares,
-                        "url": post_url,
-                        "postType": post_type,
-                        "visibility": visibility,
-                        "language": language,
-                        "entityUrn": entity_urn,
-                        "trackingId": tracking_id,
-                        "template": template,
-                        "companyName": company_name,
-                        "companyUrn": company_urn,
-                        "relativeTime": (
-                            relative_time_str if relative_time_str else None
-                        ),
-                    }
+            }
+        else:
+            with ThreadPoolExecutor(max_workers=FAN_OUT_WORKERS) as pool:
+                futures = {query: pool.submit(search, query) for query in queries}
+            fetched = {}
+            for query, future in futures.items():
+                search_error = future.exception()
+                found = future.result() if search_error is None else None
+                fetched[query] = (found, search_error)
+
+        # Merged in query order, each post once
+        seen_urns = set()
+        for query in queries:
+            found, search_error = fetched[query]
+            if search_error is not None:
+                print(f"   ⚠️ search() for '{query}' failed: {str(search_error)}")
+                continue
+            raw_results, in_window = found
+            all_raw_results.extend(raw_results)
+            for result in in_window:
+                urns = search_result_urns(result) if isinstance(result, dict) else []
+                if urns and urns[0] in seen_urns:
+                    continue
+                seen_urns.update(urns[:1])
+                search_results.append(result)
 
-                    if media:
-                        if isinstance(media, list):
-                            post_data["media"] = media[:5]
-                        else:
-                            post_data["media"] = [media]
+        print(
+            f"   🔍 All raw results: {len(all_raw_results)}, "
+            f"{len(search_results)} unique in the time range"
+        )
 
-                    all_posts.append(post_data)
+        all_posts.extend(build_posts(search_results, matcher))
 
     except Exception as e:
         import traceback
@@ -918,10 +569,126 @@ def search_posts_by_keywords(keywords, limit=50, offset=0, days_back=30):
     return all_posts, all_raw_results
 
 
+def time_range_error(time_range):
+    """Why a timeRange sent by a client is invalid, None if it is valid"""
+    if time_range is None:
+        return None
+    if not isinstance(time_range, dict):
+        return "timeRange must be an object"
+    value = time_range.get("value", 30)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        return "timeRange.value must be a non-negative number"
+    if not isinstance(time_range.get("unit", "days"), str):
+        return "timeRange.unit must be a string"
+    return None
+
+
+def time_range_to_days(time_range):
+    """Convert a {"value": 2, "unit": "months"} time range into days (default 30)"""
+    calculated_days_back = 30
+    if time_range and isinstance(time_range, dict):
+        value = time_range.get("value", 30)
+        unit = time_range.get("unit", "days").lower()
+
+        if unit == "days":
+            calculated_days_back = value
+        elif unit == "months":
+            calculated_days_back = value * 30
+        elif unit == "years":
+            calculated_days_back = value * 365
+        else:
+            calculated_days_back = value
+
+        print(f"📅 Time range: {value} {unit} ({calculated_days_back} days)")
+    else:
+        print(f"📅 Using default time range: 30 days")
+    return calculated_days_back
+
+
+def store_found_posts(found_posts):
+    """Store the posts found by a poll and record the poll time"""
+    global last_poll_timestamp
+
+    if not found_posts:
+        print("ℹ️ No posts found in this poll run")
+        return 0, 0
+
+    current_timestamp = datetime.now().isoformat()
+    added, updated = scraped_posts.extend(
+        found_posts, meta={"last_poll_timestamp": current_timestamp}
+    )
+    last_poll_timestamp = current_timestamp
+    print(
+        f"✅ Added {added} posts, updated {updated}. Total scraped: {len(scraped_posts)}"
+    )
+    return added, updated
+
+
+SUBSCRIPTION_POLL_LIMIT = 50
+# Results per page of LinkedIn's content search
+SEARCH_PAGE_SIZE = 10
+
+# Seconds between the starts of two subscription runs. Unset, it is derived
+# from the client, see subscription_start_gap()
+SUBSCRIPTION_START_GAP = os.environ.get("SUBSCRIPTION_START_GAP")
+DEFAULT_SUBSCRIPTION_START_GAP = 10
+
+
+def run_subscription(subscription):
+    """
+    Scheduler job: poll the newest posts of a subscription, in the client's
+    background lane so that polls from the extension go first
+    """
+    priority = getattr(linkedin_api, "priority", None)
+    with priority("background") if priority else nullcontext():
+        found_posts, _ = search_posts_by_keywords(
+            subscription["keywords"],
+            limit=SUBSCRIPTION_POLL_LIMIT,
+            offset=0,
+            days_back=time_range_to_days(subscription.get("timeRange")),
+        )
+    added, updated = store_found_posts(found_posts)
+    return {"found": len(found_posts), "added": added, "updated": updated}
+
+
+def subscription_start_gap():
+    """
+    Seconds between the starts of two subscription runs: SUBSCRIPTION_START_GAP
+    if set, else the time the client's rate limiter takes to send a run,
+    stretched so that the runs spread its remaining daily request budget (if
+    any) over the rest of the day. Stock clients have neither: 10 seconds
+    """
+    if SUBSCRIPTION_START_GAP:
+        return float(SUBSCRIPTION_START_GAP)
+    limiter = getattr(linkedin_api, "rate_limiter", None)
+    if limiter is None:
+        return DEFAULT_SUBSCRIPTION_START_GAP
+
+    run_requests = math.ceil(SUBSCRIPTION_POLL_LIMIT / SEARCH_PAGE_SIZE)
+    gap = run_requests * limiter.min_interval
+    budget = getattr(linkedin_api, "budget", None)
+    remaining = budget.remaining() if budget is not None else None
+    if remaining is not None:
+        seconds_left = budget.next_day() - time.time()
+        runs_left = remaining // run_requests
+        gap = max(gap, seconds_left / runs_left) if runs_left else seconds_left
+    return gap
+
+
+SUBSCRIPTIONS_PATH = os.environ.get(
+    "SUBSCRIPTIONS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "subscriptions.json"),
+)
+
+scheduler = SubscriptionScheduler(
+    run_subscription, SUBSCRIPTIONS_PATH or None, min_start_gap=subscription_start_gap
+)
+
+
 @app.route("/poll_posts", methods=["POST"])
 def poll_posts():
     """Poll for new posts matching keywords (used by polling mechanism)"""
-    global linkedin_api, scraped_posts, last_poll_timestamp
+    global linkedin_api
 
     if not linkedin_api:
         return (
@@ -933,54 +700,30 @@ def poll_posts():
         data = request.json
         keywords = data.get("keywords", [])
         client_offset = data.get("offset")
+        limit = data.get("limit", 50)
         time_range = data.get("timeRange")
 
         if not keywords:
             return jsonify({"success": False, "error": "Keywords are required"}), 400
-
-        current_timestamp = datetime.now().isoformat()
+        error = time_range_error(time_range)
+        if error:
+            return jsonify({"success": False, "error": error}), 400
 
         search_offset = client_offset if client_offset is not None else 0
         print(f"📥 Using offset from client: {search_offset}")
 
-        calculated_days_back = 30
-        if time_range and isinstance(time_range, dict):
-            value = time_range.get("value", 30)
-            unit = time_range.get("unit", "days").lower()
-
-            if unit == "days":
-                calculated_days_back = value
-            elif unit == "months":
-                calculated_days_back = value * 30
-            elif unit == "years":
-                calculated_days_back = value * 365
-            else:
-                calculated_days_back = value
-
-            print(
-                f"📅 Time range from client: {value} {unit} ({calculated_days_back} days)"
-            )
-        else:
-            print(f"📅 Using default time range: 30 days")
-
         all_found_posts, raw_search_results = search_posts_by_keywords(
             keywords,
-            limit=50,
+            limit=limit,
             offset=search_offset,
-            days_back=calculated_days_back,
+            days_back=time_range_to_days(time_range),
+            whole_words=bool(data.get("wholeWords", False)),
+            case_sensitive=bool(data.get("caseSensitive", False)),
+            fan_out=bool(data.get("fanOut", False)),
         )
 
         print(f"🔍 Found {len(all_found_posts)} total posts in this poll")
-
-        if all_found_posts:
-            scraped_posts.extend(all_found_posts)
-            scraped_posts.sort(key=get_post_date, reverse=True)
-            last_poll_timestamp = current_timestamp
-            print(
-                f"✅ Appended {len(all_found_posts)} posts. Total scraped: {len(scraped_posts)}"
-            )
-        else:
-            print("ℹ️ No posts found in this poll run")
+        store_found_posts(all_found_posts)
 
         return jsonify(
             {
@@ -997,19 +740,270 @@ def poll_posts():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def encode_cursor(key):
+    """Opaque cursor for a key of the post store date index"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor):
+    sort_key, post_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return (sort_key, post_id)
+
+
 @app.route("/get_scraped_posts", methods=["GET"])
 def get_scraped_posts():
-    """Get all scraped post IDs (sorted by date, newest first)"""
-    sorted_posts = sorted(scraped_posts, key=get_post_date, reverse=True)
+    """
+    Get scraped posts (sorted by date, newest first)
+
+    Query params, all optional (without them every post is returned):
+    - limit, cursor: page through the posts, passing the next_cursor of the
+      previous page as cursor
+    - since: only the posts added or updated after this version, oldest
+      change first. reset is true when the posts were cleared since then
+      and the client has to start over
+
+    Responses carry an ETag: a request with a matching If-None-Match gets a 304
+    """
+    version = scraped_posts.version
+    if request.if_none_match.contains(str(version)):
+        response = app.response_class(status=304)
+        response.set_etag(str(version))
+        return response
+
+    try:
+        limit = request.args.get("limit", type=int)
+        since = request.args.get("since", type=int)
+        cursor = request.args.get("cursor")
+        cursor = decode_cursor(cursor) if cursor else None
+    except (ValueError, TypeError):
+        return jsonify({"success": False, "error": "Invalid cursor"}), 400
+    if limit is not None and limit <= 0:
+        return jsonify({"success": False, "error": "limit must be positive"}), 400
+
+    if since is not None:
+        reset = since < scraped_posts.cleared_version or since > version
+        # After a reset the client starts over from the clear, like /stream_posts
+        posts, last_version = scraped_posts.changed_since(
+            scraped_posts.cleared_version if reset else since, limit=limit
+        )
+        if not posts:
+            # Nothing changed up to `version`: the next poll can start there
+            last_version = max(last_version, version)
+        body = {
+            "success": True,
+            "posts": posts,
+            "count": len(posts),
+            "version": last_version,
+            "has_more": last_version < scraped_posts.version,
+            "reset": reset,
+        }
+    elif limit is not None or cursor is not None:
+        posts, next_key = scraped_posts.page(limit or 100, cursor)
+        body = {
+            "success": True,
+            "posts": posts,
+            "count": len(posts),
+            "total": len(scraped_posts),
+            "next_cursor": encode_cursor(next_key) if next_key else None,
+            "version": version,
+        }
+    else:
+        sorted_posts = scraped_posts.list()
+        body = {
+            "success": True,
+            "posts": sorted_posts,
+            "count": len(sorted_posts),
+            "version": version,
+        }
+
+    response = jsonify(body)
+    response.set_etag(str(version))
+    return response
+
+
+@app.route("/stream_posts", methods=["GET"])
+def stream_posts():
+    """
+    Server-sent events stream of the posts added or updated from now on
+
+    Each "posts" event carries up to STREAM_BATCH_SIZE posts, and its id is
+    the store version of the last one: reconnecting with a Last-Event-ID
+    header (or a lastEventId query param) resumes right after it. A "reset"
+    event tells the client the posts were cleared.
+
+    A slow client doesn't queue anything up: the next batch is only read
+    from the store once the previous one has been written to its socket
+    """
+    global stream_clients
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get(
+        "lastEventId"
+    )
+    try:
+        version = int(last_event_id) if last_event_id else scraped_posts.version
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid Last-Event-ID"}), 400
+
+    with stream_clients_lock:
+        if stream_clients >= MAX_STREAM_CLIENTS:
+            return jsonify({"success": False, "error": "Too many streams"}), 503
+        stream_clients += 1
+
+    def events(version):
+        yield "retry: 5000\n\n"
+        while True:
+            if (
+                version < scraped_posts.cleared_version
+                or version > scraped_posts.version
+            ):
+                version = scraped_posts.cleared_version
+                yield f"id: {version}\nevent: reset\ndata: {{}}\n\n"
+
+            posts, last_version = scraped_posts.changed_since(
+                version, limit=STREAM_BATCH_SIZE
+            )
+            if posts:
+                version = last_version
+                data = json.dumps({"posts": posts, "count": len(posts)})
+                yield f"id: {version}\nevent: posts\ndata: {data}\n\n"
+                continue
+
+            if not scraped_posts.wait_for_change(
+                version, timeout=STREAM_KEEPALIVE_SECONDS
+            ):
+                # also how we find out the client went away
+                yield ": keepalive\n\n"
+
+    def release():
+        global stream_clients
+        with stream_clients_lock:
+            stream_clients -= 1
+
+    response = Response(
+        events(version),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # released when the response is closed: a finally in the generator would
+    # not run for a response closed before its first iteration
+    response.call_on_close(release)
+    return response
 
-    return jsonify({"success": True, "posts": sorted_posts, "count": len(sorted_posts)})
+
+@app.route("/export_posts", methods=["POST"])
+def export_posts():
+    """Export scraped posts to a Parquet or Arrow IPC file"""
+    if export_records is None:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": "Export is not available. Run `npm run copy-lib` and install pyarrow: pip install pyarrow",
+                }
+            ),
+            500,
+        )
+
+    data = request.json or {}
+    export_format = data.get("format", "parquet")
+    batch_size = data.get("batchSize", 10000)
+
+    if export_format not in EXPORT_EXTENSIONS:
+        return (
+            jsonify({"success": False, "error": "format must be parquet or arrow"}),
+            400,
+        )
+    if not isinstance(batch_size, int) or batch_size < 1:
+        return (
+            jsonify(
+                {"success": False, "error": "batchSize must be a positive integer"}
+            ),
+            400,
+        )
+
+    # The client never chooses the path: exports go to EXPORTS_DIR, under a
+    # generated name
+    filename = "posts-{}-{}.{}".format(
+        datetime.now().strftime("%Y%m%d-%H%M%S"),
+        uuid.uuid4().hex[:8],
+        EXPORT_EXTENSIONS[export_format],
+    )
+    path = os.path.join(EXPORTS_DIR, filename)
+
+    try:
+        os.makedirs(EXPORTS_DIR, exist_ok=True)
+        count = export_records(
+            scraped_posts.batches(batch_size),
+            path,
+            "posts",
+            format=export_format,
+            batch_size=batch_size,
+        )
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    return jsonify({"success": True, "count": count, "filename": filename})
+
+
+@app.route("/exports/<filename>", methods=["GET"])
+def download_export(filename):
+    """Download a file written by /export_posts"""
+    return send_from_directory(EXPORTS_DIR, filename, as_attachment=True)
+
+
+@app.route("/subscriptions", methods=["GET"])
+def list_subscriptions():
+    """List the keyword subscriptions polled by the server"""
+    subscriptions = scheduler.list()
+    return jsonify(
+        {"success": True, "subscriptions": subscriptions, "count": len(subscriptions)}
+    )
+
+
+@app.route("/subscriptions", methods=["POST"])
+def create_subscription():
+    """
+    Subscribe to keywords: the server polls them every `interval` seconds
+    (at least 60), even with the extension closed, once logged in
+    """
+    data = request.json or {}
+    keywords = data.get("keywords", [])
+    interval = data.get("interval", 15 * 60)
+
+    if not keywords or not isinstance(keywords, list):
+        return jsonify({"success": False, "error": "Keywords are required"}), 400
+    if not isinstance(interval, (int, float)):
+        return jsonify({"success": False, "error": "interval must be a number"}), 400
+    error = time_range_error(data.get("timeRange"))
+    if error:
+        return jsonify({"success": False, "error": error}), 400
+
+    subscription = scheduler.create(keywords, interval, data.get("timeRange"))
+    return jsonify({"success": True, "subscription": subscription}), 201
+
+
+@app.route("/subscriptions/<subscription_id>", methods=["DELETE"])
+def delete_subscription(subscription_id):
+    """Delete a keyword subscription"""
+    if not scheduler.delete(subscription_id):
+        return jsonify({"success": False, "error": "Subscription not found"}), 404
+    return jsonify({"success": True, "message": "Subscription deleted"})
+
+
+@app.route("/extraction_stats", methods=["GET"])
+def extraction_stats():
+    """
+    How often each field of the search results was found at each of its
+    fallback paths, since the server started (paths at 0 never matched)
+    """
+    return jsonify({"success": True, "fields": search_result_extractor.stats()})
 
 
 @app.route("/clear_posts", methods=["POST"])
 def clear_posts():
     """Clear all scraped posts"""
-    global scraped_posts, last_poll_timestamp
-    scraped_posts = []
+    global last_poll_timestamp
+    scraped_posts.clear()
     last_poll_timestamp = None
     return jsonify({"success": True, "message": "All scraped posts cleared"})
 
@@ -1024,4 +1018,9 @@ def logout():
 
 if __name__ == "__main__":
     print("📡 Server will run on http://localhost:8000")
-    app.run(host="0.0.0.0", port=8000, debug=True)
+    debug = True
+    # with debug=True the reloader runs the app in a child process (flagged by
+    # WERKZEUG_RUN_MAIN): only that one may poll, or every run would go twice
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        scheduler.start()
+    app.run(host="0.0.0.0", port=8000, debug=debug, threaded=True)
@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "linkedin-extension", "backend")
+
+# linkedin.py and the backend modules are imported from the source tree. The
+# backend keeps its state in memory and writes exports to a temporary
+# directory, so that importing server.py touches nothing outside of it
+sys.path[:0] = [ROOT, BACKEND]
+os.environ["POSTS_DB_PATH"] = ""
+os.environ["SUBSCRIPTIONS_PATH"] = ""
+os.environ["EXPORTS_DIR"] = tempfile.mkdtemp(prefix="exports-")
@@ -0,0 +1,66 @@
+import json
+
+from linkedin import EntityStore, ResponseArchive, reextract_archive
+
+SEARCH_URL = (
+    "https://www.linkedin.com/voyager/api/graphql?variables=(start:0)"
+    "&queryId=voyagerSearchDashClusters.ef3d0937fb65bd7812e32e5a85028e79"
+)
+
+
+def search_page(*urns):
+    items = [
+        {
+            "_type": "com.linkedin.voyager.dash.search.SearchItem",
+            "item": {
+                "searchFeedUpdate": {
+                    "_type": "com.linkedin.voyager.dash.search.SearchUpdateWrapper",
+                    "update": {"metadata": {"backendUrn": urn}},
+                }
+            },
+        }
+        for urn in urns
+    ]
+    clusters = {
+        "elements": [
+            {
+                "_type": "com.linkedin.voyager.dash.search.SearchClusterViewModel",
+                "items": items,
+            }
+        ]
+    }
+    return {"data": {"searchDashClustersByAll": clusters}}
+
+
+def test_archive_round_trip(tmp_path):
+    archive = ResponseArchive(str(tmp_path / "archive"), segment_size=64)
+    bodies = [json.dumps({"n": i}).encode() for i in range(5)]
+    for i, body in enumerate(bodies):
+        archive.append("feed/updates", f"https://x/{i}", 200, body, fetched_at=i)
+    archive.close()
+
+    archive = ResponseArchive(str(tmp_path / "archive"), segment_size=64)
+    entries = list(archive.entries(since=2))
+    assert [archive.read(entry) for entry in entries] == bodies[2:]
+    assert len({entry["segment"] for entry in archive.entries()}) > 1
+    assert list(archive.entries(endpoints=["feed/comments"])) == []
+
+
+def test_reextract_keyword_searches(tmp_path):
+    archive = ResponseArchive(str(tmp_path / "archive"))
+    for fetched_at, urns in enumerate(
+        [("urn:li:activity:1", "urn:li:activity:2"), ("urn:li:activity:2",)]
+    ):
+        body = json.dumps(search_page(*urns)).encode()
+        archive.append(
+            "graphql:voyagerSearchDashClusters", SEARCH_URL, 200, body, fetched_at
+        )
+    archive.append("graphql:voyagerSearchDashClusters", SEARCH_URL, 429, b"{}")
+    archive.close()
+
+    store = EntityStore(str(tmp_path / "entities.db"))
+    counts = reextract_archive(archive, store, processes=1)
+
+    assert counts == {"posts": 3}
+    assert store.count("posts") == 2
+    store.close()
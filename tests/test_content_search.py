@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+import server
+from extraction import search_result_extractor
+
+DAY_MS = 24 * 3600 * 1000
+
+
+def result(days_ago, text="python"):
+    activity_id = int(time.time() * 1000 - days_ago * DAY_MS) << 22
+    return {
+        "update": {
+            "metadata": {"backendUrn": f"urn:li:activity:{activity_id}"},
+            "commentary": {"text": {"text": text}},
+        }
+    }
+
+
+class PagedClient:
+    def __init__(self, pages):
+        self.pages = pages
+        self.served = 0
+        self.params = None
+
+    def iter_search(self, params, limit=None, offset=0):
+        self.params = params
+        for page in self.pages:
+            self.served += 1
+            yield page
+
+
+@pytest.mark.parametrize(
+    "days_back, date_posted",
+    [
+        (1, "past-24h"),
+        (2, "past-week"),
+        (7, "past-week"),
+        (30, "past-month"),
+        (31, None),
+    ],
+)
+def test_date_posted_filter(days_back, date_posted):
+    filters = server.content_search_filters(days_back)
+
+    assert "(key:resultType,value:List(CONTENT))" in filters
+    assert "(key:sortBy,value:List(date_posted))" in filters
+    if date_posted:
+        assert f"(key:datePosted,value:List({date_posted}))" in filters
+    else:
+        assert "datePosted" not in filters
+
+
+def test_no_time_range_no_date_filters():
+    assert server.content_search_filters(None) == (
+        "List((key:resultType,value:List(CONTENT)))"
+    )
+
+
+def test_paging_stops_at_the_first_page_out_of_the_window(monkeypatch):
+    new, old = result(1), result(10)
+    client = PagedClient([[new, old], [old, old], [new]])
+    monkeypatch.setattr(server, "linkedin_api", client)
+    window_start = (time.time() - 7 * 86400) * 1000
+
+    raw, in_window = server.fetch_content_search("python", 50, 0, window_start, 7)
+
+    assert raw == [new, old, old, old]
+    assert in_window == [new]
+    assert client.served == 2
+    assert "past-week" in client.params["filters"]
+
+
+def test_results_out_of_the_window_are_not_extracted(monkeypatch):
+    extracted = []
+
+    class Spy:
+        def extract_many(self, results):
+            extracted.extend(results)
+            return search_result_extractor.extract_many(results)
+
+    new, old = result(1), result(10)
+    monkeypatch.setattr(server, "linkedin_api", PagedClient([[new, old]]))
+    monkeypatch.setattr(server, "search_result_extractor", Spy())
+
+    posts, raw = server.search_posts_by_keywords(["python"], days_back=7)
+
+    assert raw == [new, old]
+    assert extracted == [new]
+    assert len(posts) == 1
+
+
+@pytest.mark.parametrize(
+    "time_range", ["30", {"value": "30", "unit": "days"}, {"value": -1}]
+)
+def test_invalid_time_ranges_are_rejected(monkeypatch, time_range):
+    monkeypatch.setattr(server, "linkedin_api", PagedClient([]))
+    client = server.app.test_client()
+
+    res = client.post(
+        "/poll_posts", json={"keywords": ["python"], "timeRange": time_range}
+    )
+    assert res.status_code == 400
+    res = client.post(
+        "/subscriptions", json={"keywords": ["python"], "timeRange": time_range}
+    )
+    assert res.status_code == 400
+    assert server.scheduler.list() == []
@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+
+from linkedin import EntityStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EntityStore(str(tmp_path / "entities.db"), batch_size=1000)
+    yield store
+    store.close()
+
+
+def test_upsert_merges_by_urn(store):
+    store.upsert("posts", [{"urn": "urn:li:activity:1", "createdAt": 5}])
+    store.upsert("posts", [{"urn": "urn:li:activity:1", "text": "edited"}])
+    store.upsert("posts", [{"text": "no urn"}, "not an entity"])
+
+    assert store.count("posts") == 1
+    assert store.get("posts", "urn:li:activity:1")["text"] == "edited"
+    assert store.query("posts", since=5) != []
+
+
+def test_object_columns_are_coerced(store):
+    jobs = [
+        {
+            "entityUrn": "urn:li:fsd_jobPosting:1",
+            "companyDetails": {"company": {"entityUrn": "urn:li:company:9"}},
+        },
+        {
+            "entityUrn": "urn:li:fsd_jobPosting:2",
+            "*companyDetails": ["urn:li:company:9"],
+            "posterId": {"nested": True},
+        },
+    ]
+    assert store.upsert("jobs", jobs) == 2
+    store.flush()
+
+    assert store.count("jobs") == 2
+    [job] = store.query("jobs", company_urn="urn:li:company:9")
+    assert job["entityUrn"] == "urn:li:fsd_jobPosting:1"
+
+
+def test_failed_flush_does_not_poison_the_store(store):
+    store.upsert("posts", [{"urn": "urn:li:activity:1"}])
+    store._pending["posts"].append(("urn:li:activity:2", object()) + (None,) * 5)
+    store._pending_count += 1
+
+    with pytest.raises(sqlite3.Error):
+        store.flush()
+    assert store.count("posts") == 0
+
+    store.upsert("posts", [{"urn": "urn:li:activity:3"}])
+    assert store.count("posts") == 1
+
+
+@pytest.mark.parametrize("method", ["get", "query", "count"])
+def test_unknown_tables_are_rejected(store, method):
+    args = ("posts; DROP TABLE posts",) + (("urn",) if method == "get" else ())
+    with pytest.raises(ValueError):
+        getattr(store, method)(*args)
+    with pytest.raises(ValueError):
+        store.upsert("nope", [])
@@ -0,0 +1,69 @@
+from extraction import Extractor, Field, search_result_extractor, update_paths
+
+
+def test_first_present_path_wins():
+    extractor = Extractor([Field("name", ["a.name", "b.name"])])
+
+    assert extractor.extract({"a": {"name": ""}, "b": {"name": "x"}}) == {"name": "x"}
+    assert extractor.extract({"a": {"name": "y"}, "b": {"name": "x"}}) == {"name": "y"}
+    assert extractor.extract({}) == {"name": ""}
+
+
+def test_zero_is_a_value_and_wrong_types_are_skipped():
+    extractor = Extractor(
+        [Field("likes", ["likes", "count"], types=int, default=None)]
+    )
+
+    assert extractor.extract({"likes": 0, "count": 5}) == {"likes": 0}
+    assert extractor.extract({"likes": "12", "count": 5}) == {"likes": 5}
+
+
+def test_list_indexes_and_wildcards():
+    extractor = Extractor(
+        [
+            Field("first", ["items.0.name"]),
+            Field("any", ["items.*.name"]),
+        ]
+    )
+
+    fields = extractor.extract({"items": [{"id": 1}, {"name": "b"}]})
+
+    assert fields == {"first": "", "any": "b"}
+
+
+def test_transforms_and_update_paths():
+    extractor = Extractor(
+        [Field("headline", update_paths(("headline", str.upper), "title"))]
+    )
+
+    assert extractor.extract({"update": {"headline": "a"}, "headline": "b"}) == {
+        "headline": "A"
+    }
+    assert extractor.extract({"title": "t"}) == {"headline": "t"}
+
+
+def test_stats_count_the_path_that_fired():
+    extractor = Extractor([Field("name", ["a", "b"])])
+
+    extractor.extract_many([{"a": "x"}, {"b": "y"}, {"b": "z"}, {}])
+
+    assert extractor.stats() == {"name": {"a": 1, "b": 2, "(missing)": 1}}
+
+
+def test_search_result_fields():
+    result = {
+        "update": {
+            "metadata": {"backendUrn": "urn:li:activity:1"},
+            "commentary": {"text": {"text": "Hello"}},
+            "actor": {"name": {"text": "Ada"}},
+            "socialDetail": {"totalSocialActivityCounts": {"numLikes": 0}},
+        }
+    }
+
+    fields = search_result_extractor.extract(result)
+
+    assert fields["urn"] == "urn:li:activity:1"
+    assert fields["text"] == "Hello"
+    assert fields["actorName"] == "Ada"
+    assert fields["likes"] == 0
+    assert fields["media"] is None
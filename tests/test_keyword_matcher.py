@@ -0,0 +1,48 @@
+from keyword_matcher import KeywordMatcher
+
+
+def test_finds_overlapping_keywords_in_one_pass():
+    matcher = KeywordMatcher(["he", "she", "hers", "his"])
+
+    found = matcher.search("ushers")
+
+    assert sorted(matcher.keywords[i] for i in found) == ["he", "hers", "she"]
+
+
+def test_case_folding():
+    assert KeywordMatcher(["Python"]).search("PYTHON jobs") == {0}
+    assert KeywordMatcher(["straße"]).search("STRASSE") == {0}
+    assert KeywordMatcher(["Python"], case_sensitive=True).search("python") == set()
+
+
+def test_whole_words():
+    matcher = KeywordMatcher(["AI", "machine learning"], whole_words=True)
+
+    assert matcher.search("said the rain") == set()
+    assert matcher.search("AI, ML and machine learning.") == {0, 1}
+    assert matcher.search("AI_team") == set()
+
+
+def test_whole_words_tries_every_occurrence():
+    matcher = KeywordMatcher(["ai"], whole_words=True)
+
+    assert matcher.search("said ai") == {0}
+
+
+def test_blank_and_duplicate_keywords_are_skipped():
+    matcher = KeywordMatcher(["", "  ", "go", "go", 42])
+
+    assert matcher.keywords == ["go", "42"]
+    assert bool(matcher)
+    assert not KeywordMatcher([" "])
+
+
+def test_match_reports_fields_in_keyword_order():
+    matcher = KeywordMatcher(["rust", "python"])
+
+    keywords, fields = matcher.match(
+        {"text": "Python and Rust", "title": "rust", "likes": 3, "author": None}
+    )
+
+    assert keywords == ["rust", "python"]
+    assert fields == {"python": ["text"], "rust": ["text", "title"]}
@@ -0,0 +1,304 @@
+import logging
+import threading
+
+import pytest
+
+from linkedin import (
+    BudgetExceededException,
+    CompanyWatchlist,
+    IdentityIndex,
+    JobStore,
+    Linkedin,
+    RequestBudget,
+)
+
+
+def make_client(**attrs):
+    """A Linkedin client that sends nothing: the methods a test needs are
+    replaced through `attrs`"""
+    client = Linkedin.__new__(Linkedin)
+    client.logger = logging.getLogger("test")
+    client.max_workers = 2
+    client._priority = threading.local()
+    client.__dict__.update(attrs)
+    return client
+
+
+def test_enrich_jobs_does_not_cache_failed_halves():
+    def get_job(job_id):
+        if job_id == "2":
+            raise RuntimeError("boom")
+        return {"id": job_id}
+
+    def get_job_skills(job_id):
+        return {} if job_id == "3" else {"skills": [job_id]}
+
+    client = make_client(get_job=get_job, get_job_skills=get_job_skills)
+    cache = {"urn:li:fsd_jobPosting:4": {"cached": True}}
+    urns = [f"urn:li:fsd_jobPosting:{i}" for i in range(1, 5)]
+
+    records = list(client.enrich_jobs(urns, cache=cache))
+
+    assert [r["job_urn"] for r in records] == ["urn:li:fsd_jobPosting:1"]
+    assert records[0]["job"] == {"id": "1"}
+    assert sorted(cache) == ["urn:li:fsd_jobPosting:1", "urn:li:fsd_jobPosting:4"]
+
+
+def test_monitor_companies_puts_off_companies_over_budget(tmp_path):
+    def iter_company_updates(public_id):
+        if public_id == "over":
+            raise BudgetExceededException("daily cap reached")
+        yield [{"urn": f"urn:li:activity:{public_id}"}]
+
+    client = make_client(iter_company_updates=iter_company_updates)
+    watchlist = CompanyWatchlist(str(tmp_path / "watchlist.json"))
+    watchlist.add(["over", "ok"])
+
+    updates = list(client.monitor_companies(watchlist))
+
+    assert updates == [("ok", {"urn": "urn:li:activity:ok"})]
+    assert watchlist.companies["over"]["next_poll"] == RequestBudget.next_day()
+    assert watchlist.due() == []
+    assert CompanyWatchlist(watchlist.path).companies["ok"]["seen"] == [
+        "urn:li:activity:ok"
+    ]
+
+
+def test_watchlist_backs_off_quiet_companies(tmp_path):
+    watchlist = CompanyWatchlist(str(tmp_path / "watchlist.json"), min_interval=10)
+    watchlist.add(["quiet"])
+    watchlist.polled("quiet", [], polled_at=1000)
+    assert watchlist.companies["quiet"]["next_poll"] == 1010
+    watchlist.polled("quiet", [], polled_at=1010)
+    assert watchlist.companies["quiet"]["next_poll"] == 1030
+
+
+def test_harvest_post_engagement_keeps_urn_types_and_reports_failures():
+    calls = []
+
+    def get_post_comments(urn, comment_count=100):
+        calls.append(("comments", urn))
+        return [{}] if urn.endswith(":3") else [{"comment": urn}]
+
+    def get_post_reactions(urn, max_results=None):
+        calls.append(("reactions", urn))
+        return [{"reactionType": "LIKE"}, {"reactionType": "PRAISE"}, {}]
+
+    client = make_client(
+        get_post_comments=get_post_comments, get_post_reactions=get_post_reactions
+    )
+    posts = ["urn:li:ugcPost:1", "2", "urn:li:activity:3"]
+    harvested = {e["post_urn"]: e for e in client.harvest_post_engagement(posts)}
+
+    assert harvested["urn:li:ugcPost:1"]["error"] is None
+    assert harvested["urn:li:ugcPost:1"]["reactions"] == {
+        "LIKE": 1,
+        "PRAISE": 1,
+        "UNKNOWN": 1,
+    }
+    assert ("reactions", "urn:li:ugcPost:1") in calls
+    assert ("comments", "urn:li:activity:2") in calls
+    assert set(harvested["urn:li:activity:3"]) == {"post_urn", "error"}
+    assert isinstance(harvested["urn:li:activity:3"]["error"], Exception)
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+@pytest.mark.parametrize(
+    "post_urn, update_id",
+    [("123", "activity:123"), ("urn:li:ugcPost:123", "ugcPost:123")],
+)
+def test_get_post_comments_update_id(post_urn, update_id):
+    sent = []
+    stored = []
+    comments = [{"entityUrn": "urn:li:comment:1"}]
+
+    def fetch(url, params=None):
+        sent.append(params["updateId"])
+        return FakeResponse(
+            {"elements": comments, "metadata": {"paginationToken": ""}, "paging": {}}
+        )
+
+    def store(table, entities, parent_urn=None):
+        stored.append((table, parent_urn))
+
+    client = make_client(_fetch=fetch, _store=store, identity_index=IdentityIndex())
+    assert client.get_post_comments(post_urn) == comments
+    assert sent == [update_id]
+    assert stored == [("comments", f"urn:li:{update_id}")]
+
+
+def test_requests_time_out_by_default():
+    client = Linkedin("user", "password", authenticate=False, min_request_interval=0)
+    sent = []
+    client._request = lambda endpoint, method, url, **kwargs: sent.append(kwargs)
+    client.archive = None
+
+    client._send("POST", "/me", lambda: None, False)
+    client.request_timeout = None
+    client._send("POST", "/me", lambda: None, False)
+
+    assert sent == [{"timeout": Linkedin._REQUEST_TIMEOUT_SECONDS}, {}]
+
+
+class HedgedResponse:
+    def __init__(self, name, status_code=200):
+        self.name = name
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_hedging_client():
+    client = Linkedin(
+        "user",
+        "password",
+        authenticate=False,
+        min_request_interval=0,
+        hedge_requests=True,
+        hedge_delay=0,
+        max_hedge_ratio=1.0,
+    )
+    client.metrics.record("me", 0.1)
+    return client
+
+
+def slow_primary(primary, backup):
+    """A _request whose first call answers `primary` once released, and the
+    second `backup` at once"""
+    primary_sent = threading.Event()
+    release = threading.Event()
+
+    def request(endpoint, method, url, **kwargs):
+        if not primary_sent.is_set():
+            primary_sent.set()
+            release.wait(5)
+            return primary
+        return backup
+
+    return request, release
+
+
+def test_zero_hedge_delay_hedges_at_once():
+    client = make_hedging_client()
+    primary = HedgedResponse("primary")
+    client._request, release = slow_primary(primary, HedgedResponse("backup"))
+    try:
+        assert client._send_hedged("me", "GET", "url").name == "backup"
+    finally:
+        release.set()
+        client.close()
+    assert client._hedge_pool is None
+    assert client.metrics.totals()["hedge_wins"] == 1
+
+
+def test_server_errors_do_not_win_hedges():
+    client = make_hedging_client()
+    backup = HedgedResponse("backup", status_code=503)
+    request, release = slow_primary(HedgedResponse("primary"), backup)
+
+    def release_on_backup(*args, **kwargs):
+        # the primary only answers after the failed backup
+        response = request(*args, **kwargs)
+        release.set()
+        return response
+
+    client._request = release_on_backup
+    try:
+        assert client._send_hedged("me", "GET", "url").name == "primary"
+    finally:
+        client.close()
+    assert backup.closed
+    assert client.metrics.totals()["hedge_wins"] == 0
+
+
+def test_closed_hedge_pool_falls_back_to_plain_requests():
+    client = make_hedging_client()
+    client._request = lambda endpoint, method, url, **kwargs: "sent"
+    pool = client._hedge_pool
+    pool.shutdown()
+
+    # close() shut the pool down while this request was being sent
+    assert client._send_hedged("me", "GET", "url") == "sent"
+    client.close()
+    assert client._send_hedged("me", "GET", "url") == "sent"
+    assert client._send("GET", "/me", lambda: None, False) == "sent"
+
+
+PEOPLE = [
+    {"urn_id": str(i), "region": region}
+    for i, region in enumerate(["a", "a", "a", "b", "b", "c", "c"])
+]
+
+
+def matching(regions=None, **filters):
+    return [p for p in PEOPLE if not regions or p["region"] in regions]
+
+
+def make_search_client():
+    return make_client(
+        search_people_total=lambda **filters: len(matching(**filters)),
+        search_people=lambda include_private_profiles, limit, **filters: matching(
+            **filters
+        )[:limit],
+    )
+
+
+def test_sharding_keeps_filter_values_missing_from_shard_by():
+    client = make_search_client()
+
+    found = client.search_people_sharded(
+        {"regions": ["a", "b"]}, max_results=3, regions=["a", "b", "c"]
+    )
+
+    assert sorted(p["urn_id"] for p in found["results"]) == [
+        p["urn_id"] for p in PEOPLE
+    ]
+    assert found["coverage"]["remainder_shards"] == []
+
+
+def test_sharding_without_base_filter_keeps_a_remainder(caplog):
+    client = make_search_client()
+
+    with caplog.at_level(logging.WARNING, logger="test"):
+        shards = client.plan_people_search_shards({"regions": ["a", "b"]}, 3)
+
+    assert [(s["filters"], s["remainder"]) for s in shards] == [
+        ({}, True),
+        ({"regions": ["a"]}, False),
+        ({"regions": ["b"]}, False),
+    ]
+    assert "without a regions filter" in caplog.text
+
+    found = client.search_people_sharded({"regions": ["a", "b"]}, max_results=3)
+    assert found["coverage"]["remainder_shards"] == [{}]
+    assert found["coverage"]["reported"] == 5
+
+
+def test_harvest_jobs_reports_the_filters_of_failed_shards(tmp_path):
+    def search_jobs_total(job_type, **filters):
+        return len(job_type)
+
+    def search_jobs(limit, job_type=None, **filters):
+        if job_type == ["C"]:
+            raise RuntimeError("boom")
+        return [{"entityUrn": f"urn:li:fsd_jobPosting:{job_type[0]}"}]
+
+    client = make_client(search_jobs_total=search_jobs_total, search_jobs=search_jobs)
+    store = JobStore(str(tmp_path / "jobs.json"))
+
+    harvest = client.harvest_jobs(
+        store, shard_by={"job_type": ["F", "C"]}, max_results=1, job_type=["F", "C"]
+    )
+
+    assert [job["entityUrn"] for job in harvest["new"]] == ["urn:li:fsd_jobPosting:F"]
+    assert harvest["failed_shards"] == [{"job_type": ["C"], "listed_at": 2592000}]
+    assert store.last_run is None
@@ -0,0 +1,133 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from linkedin import (
+    BudgetExceededException,
+    IdentityIndex,
+    JobStore,
+    RateLimiter,
+    RequestBudget,
+    RequestMetrics,
+)
+
+
+def test_job_store_tells_new_changed_and_unchanged_postings(tmp_path):
+    path = str(tmp_path / "jobs.json")
+    store = JobStore(path)
+    job = {"entityUrn": "urn:li:fsd_jobPosting:1", "title": "Dev", "trackingId": "a"}
+
+    assert store.merge([job, {"title": "no urn"}]) == ([job], [])
+    assert store.merge([dict(job, trackingId="b")]) == ([], [])
+    edited = dict(job, title="Senior dev")
+    assert store.merge([edited]) == ([], [edited])
+
+    store.last_run = 123.0
+    store.save()
+    reloaded = JobStore(path)
+    assert reloaded.jobs == {job["entityUrn"]: edited}
+    assert reloaded.last_run == 123.0
+    assert reloaded.merge([edited]) == ([], [])
+
+
+def test_identity_index_resolves_any_identifier(tmp_path):
+    path = str(tmp_path / "identities.json")
+    index = IdentityIndex(path)
+    response = {
+        "included": [
+            {
+                "entityUrn": "urn:li:fs_miniProfile:ACoAA1",
+                "publicIdentifier": "ada-lovelace",
+                "objectUrn": "urn:li:member:42",
+            },
+            {"entityUrn": "urn:li:fs_miniProfile:ACoAA2", "publicIdentifier": ""},
+            {"entityUrn": "urn:li:company:7", "publicIdentifier": "acme"},
+        ]
+    }
+
+    assert index.record_from(response) == 1
+    assert index.record_from(response) == 0
+    identity = {
+        "urn_id": "ACoAA1",
+        "public_id": "ada-lovelace",
+        "member_urn": "urn:li:member:42",
+    }
+    for identifier in (
+        "ada-lovelace",
+        "ACoAA1",
+        "urn:li:fsd_profile:ACoAA1",
+        "urn:li:member:42",
+    ):
+        assert index.resolve(identifier) == identity
+    assert index.resolve("acme") is None
+
+    index.flush()
+    assert IdentityIndex(path).urn_id("ada-lovelace") == "ACoAA1"
+
+
+def test_request_budget_caps(tmp_path):
+    path = str(tmp_path / "budget.json")
+    budget = RequestBudget(
+        path, account="ada", daily_cap=3, endpoint_caps={"search": 1}
+    )
+
+    budget.charge("search")
+    with pytest.raises(BudgetExceededException):
+        budget.charge("search")
+    assert budget.remaining("search") == 0
+    budget.charge("profiles")
+    budget.charge("profiles")
+    with pytest.raises(BudgetExceededException):
+        budget.charge("feed")
+    assert budget.remaining() == 0
+    assert budget.report() == {"search": 1, "profiles": 2}
+
+    budget.flush()
+    reloaded = RequestBudget(path, account="ada")
+    assert reloaded.spent() == 3
+    assert reloaded.spent("profiles") == 2
+    assert RequestBudget(path, account="bob").spent() == 0
+
+
+def test_next_budget_day_is_next_midnight():
+    start = datetime.fromtimestamp(RequestBudget.next_day())
+
+    assert (start.hour, start.minute, start.second) == (0, 0, 0)
+    assert 0 < start.timestamp() - datetime.now().timestamp() <= 24 * 3600
+
+
+def test_request_metrics():
+    metrics = RequestMetrics(window=50)
+    for i in range(100):
+        metrics.record("search", i / 100)
+    metrics.record("search", 9.0, ok=False)
+    metrics.record("profiles", 0.2)
+    metrics.record_hedge("search")
+    metrics.record_hedge("search", won=True)
+    metrics.record_hedge("search", won=False)
+
+    # only the latest `window` latencies count, failures have none
+    assert metrics.percentile("search", 50) == 0.75
+    assert metrics.percentile("profiles", 50) is None
+    assert metrics.percentile("profiles", 50, min_samples=1) == 0.2
+    assert metrics.totals() == {
+        "requests": 102,
+        "errors": 1,
+        "hedges": 1,
+        "hedge_wins": 1,
+    }
+    assert metrics.snapshot()["search"]["p99"] == 0.99
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(0.05)
+
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.wait()
+
+    assert time.monotonic() - started >= 0.1
+    with pytest.raises(ValueError):
+        limiter.wait("urgent")
+
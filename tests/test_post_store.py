@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from post_store import PostStore, SortedIndex
+
+
+def post(post_id, created, **fields):
+    return dict(id=post_id, createdAt=created, **fields)
+
+
+def test_sorted_index_across_chunks():
+    keys = list(range(200))
+    random.Random(0).shuffle(keys)
+    index = SortedIndex(chunk_size=4)
+    for key in keys:
+        index.add(key)
+    for key in range(0, 200, 3):
+        index.remove(key)
+
+    expected = [key for key in range(200) if key % 3]
+    assert list(index) == expected
+    assert len(index) == len(expected)
+    assert index.slice(10, 20) == expected[10:20]
+    assert index.bisect_right(100) == sum(1 for key in expected if key <= 100)
+    with pytest.raises(KeyError):
+        index.remove(3)
+
+
+def test_posts_are_listed_newest_first():
+    store = PostStore(chunk_size=2)
+    store.extend([post(str(i), i * 1000) for i in (3, 1, 4, 2, 5)])
+
+    assert [p["id"] for p in store.list()] == ["5", "4", "3", "2", "1"]
+    assert [p["id"] for p in store.list(1, 3)] == ["4", "3"]
+
+
+def test_polled_again_posts_are_merged():
+    store = PostStore()
+    assert store.upsert(post("1", 1000, likes=1, keywords=["a"], text="hi"))
+
+    assert not store.upsert(post("1", 1000, likes=5, keywords=["b"], text=""))
+    assert store.extend([post("1", 1000, likes=5)]) == (0, 0)
+
+    assert len(store) == 1
+    assert store.get(1) == post("1", 1000, likes=5, keywords=["a", "b"], text="hi")
+
+
+def test_pages_do_not_shift_on_inserts():
+    store = PostStore()
+    store.extend([post(str(i), i * 1000) for i in range(1, 6)])
+
+    first, cursor = store.page(2)
+    store.upsert(post("6", 6000))
+    second, cursor = store.page(2, cursor)
+    third, cursor = store.page(2, cursor)
+
+    assert [p["id"] for p in first + second + third] == ["5", "4", "3", "2", "1"]
+    assert cursor is None
+
+
+def test_changed_since():
+    store = PostStore()
+    store.extend([post("1", 1000), post("2", 2000)])
+    version = store.version
+    store.upsert(post("1", 1000, likes=3))
+
+    posts, last = store.changed_since(version)
+
+    assert [p["id"] for p in posts] == ["1"]
+    assert last == store.version
+    assert store.changed_since(last) == ([], last)
+
+
+def test_persisted_posts_are_reloaded(tmp_path):
+    path = str(tmp_path / "posts.db")
+    store = PostStore(path)
+    store.extend([post("1", 1000), post("2", 2000)], meta={"cursor": "x"})
+    store.upsert(post("1", 1000, likes=2))
+    version = store.version
+
+    reloaded = PostStore(path)
+
+    assert [p["id"] for p in reloaded.list()] == ["2", "1"]
+    assert reloaded.get("1")["likes"] == 2
+    assert reloaded.version == version
+    assert reloaded.get_meta("cursor") == "x"
+    assert reloaded.changed_since(version - 1)[0] == [reloaded.get("1")]
+
+
+def test_clear_keeps_versions_counting(tmp_path):
+    store = PostStore(str(tmp_path / "posts.db"))
+    store.upsert(post("1", 1000))
+    version = store.version
+
+    store.clear()
+
+    assert len(store) == 0
+    assert store.cleared_version == store.version > version
+    assert PostStore(store.path).cleared_version == store.cleared_version
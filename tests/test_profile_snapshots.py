@@ -0,0 +1,74 @@
+import pytest
+
+from linkedin import ProfileSnapshotStore
+
+
+def profile(**fields):
+    data = {
+        "urn_id": "ACoAA1",
+        "firstName": "Ada",
+        "headline": "Engineer",
+        "displayPictureUrl": "https://media/abc?e=1&t=token1",
+        "img_100_100": "/100?e=1&t=token1",
+        "experience": [
+            {
+                "title": "Engineer",
+                "companyName": "Acme",
+                "companyLogoUrl": "https://media/logo?t=token1",
+            }
+        ],
+        "skills": [{"name": "Python"}],
+    }
+    data.update(fields)
+    return data
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProfileSnapshotStore(str(tmp_path / "snapshots.db"))
+    yield store
+    store.close()
+
+
+def test_first_record_stores_every_section(store):
+    changed = store.record(profile(), fetched_at=1)
+    assert set(changed) == set(ProfileSnapshotStore.SECTIONS) | {"profile"}
+    assert store.get("ACoAA1")["headline"] == "Engineer"
+    assert store.changes_since(0) == []
+    assert len(store.changes_since(0, include_initial=True)) == len(changed)
+
+
+def test_expiring_picture_urls_are_not_changes(store):
+    store.record(profile(), fetched_at=1)
+    refetched = profile(
+        displayPictureUrl="https://media/abc?e=2&t=token2",
+        img_100_100="/100?e=2&t=token2",
+        trackingId="xyz",
+        experience=[
+            {
+                "title": "Engineer",
+                "companyName": "Acme",
+                "companyLogoUrl": "https://media/logo?t=token2",
+            }
+        ],
+    )
+    assert store.record(refetched, fetched_at=2) == []
+
+
+def test_changes_are_deltas(store):
+    store.record(profile(), fetched_at=1)
+    changed = store.record(
+        profile(headline="Staff Engineer", skills=[{"name": "Rust"}]), fetched_at=2
+    )
+
+    assert sorted(changed) == ["profile", "skills"]
+    changes = {c["section"]: c for c in store.changes_since(2)}
+    assert changes["profile"]["delta"] == {
+        "changed": {"headline": ["Engineer", "Staff Engineer"]}
+    }
+    assert changes["skills"]["delta"] == {
+        "added": [{"name": "Rust"}],
+        "removed": [{"name": "Python"}],
+    }
+    assert store.changes_since(3) == []
+    assert store.changes_since(0, sections=["skills"])[0]["section"] == "skills"
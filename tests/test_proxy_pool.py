@@ -0,0 +1,121 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import linkedin
+from linkedin import Linkedin, ProxyPool, RateLimiter, RequestMetrics
+
+
+class StubProxy:
+    """A local HTTP proxy that answers every request itself with `status`"""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                self.send_response(stub.status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    proxies = [StubProxy(), StubProxy()]
+    yield proxies
+    for proxy in proxies:
+        proxy.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(linkedin, "monotonic", lambda: now[0])
+    return now
+
+
+def make_client(pool):
+    client = Linkedin.__new__(Linkedin)
+    session = requests.Session()
+    session.trust_env = False
+    client.client = SimpleNamespace(
+        session=session,
+        API_BASE_URL="http://linkedin.test/voyager/api",
+        LINKEDIN_BASE_URL="http://linkedin.test",
+    )
+    client.proxy_pool = pool
+    client.metrics = RequestMetrics()
+    client.rate_limiter = RateLimiter(0)
+    client._priority = threading.local()
+    client.budget = None
+    client.archive = None
+    client.request_timeout = 5
+    client.hedge_requests = False
+    return client
+
+
+def get(client, **kwargs):
+    return client._send("GET", "/me", lambda: None, False, **kwargs)
+
+
+def test_requests_rotate_across_proxies(stubs):
+    client = make_client(ProxyPool([stub.url for stub in stubs]))
+
+    for _ in range(40):
+        assert get(client).status_code == 200
+
+    assert all(stub.hits > 0 for stub in stubs)
+    assert sum(stub.hits for stub in stubs) == 40
+
+
+def test_banned_proxy_is_left_out_until_it_recovers(stubs, clock):
+    banned, healthy = stubs
+    banned.status = 999
+    pool = ProxyPool([banned.url, healthy.url], ban_quarantine=60)
+    client = make_client(pool)
+
+    while banned.hits == 0:
+        get(client)
+    assert [p["quarantined"] for p in pool.stats()] == [True, False]
+
+    hits = banned.hits
+    for _ in range(20):
+        assert get(client).status_code == 200
+    assert banned.hits == hits
+
+    banned.status = 200
+    clock[0] += 61
+    assert [p["quarantined"] for p in pool.stats()] == [False, False]
+    for _ in range(40):
+        get(client)
+    assert banned.hits > hits
+
+
+def test_caller_proxies_are_merged(stubs):
+    pooled, own = stubs
+    client = make_client(ProxyPool([pooled.url]))
+
+    get(client, proxies={"https": "http://127.0.0.1:9"})
+    assert (pooled.hits, own.hits) == (1, 0)
+
+    get(client, proxies={"http": own.url})
+    assert (pooled.hits, own.hits) == (1, 1)
+    assert client.proxy_pool.stats()[0]["requests"] == 1
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+import linkedin
+from linkedin import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A clock that only moves when the test says so"""
+    now = [0.0]
+    monkeypatch.setattr(linkedin, "monotonic", lambda: now[0])
+    return now
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def queue(limiter, lane):
+    """Start a request in `lane` and return once it is queued"""
+    queued = len(limiter._queues[lane])
+    thread = threading.Thread(target=limiter.wait, args=(lane,), daemon=True)
+    thread.start()
+    wait_for(lambda: len(limiter._queues[lane]) > queued)
+    return thread
+
+
+def grant_next(limiter, clock):
+    """Open the next slot and return the lane it went to"""
+    before = dict(limiter.granted)
+    clock[0] += limiter.min_interval
+    with limiter._cond:
+        limiter._cond.notify_all()
+    wait_for(lambda: limiter.granted != before)
+    return next(lane for lane in before if limiter.granted[lane] != before[lane])
+
+
+def test_interactive_lane_gets_its_weighted_share(clock):
+    limiter = RateLimiter(1.0)
+    limiter.wait()
+    threads = [queue(limiter, "background") for _ in range(3)]
+    threads += [queue(limiter, "interactive") for _ in range(3)]
+
+    order = [grant_next(limiter, clock) for _ in threads]
+
+    assert order == ["background"] + ["interactive"] * 3 + ["background"] * 2
+    for thread in threads:
+        thread.join(1)
+
+
+def test_starving_request_goes_first(clock):
+    limiter = RateLimiter(1.0, max_wait=30)
+    limiter.wait()
+    background = queue(limiter, "background")
+    clock[0] = 0.5
+    interactive = [queue(limiter, "interactive") for _ in range(8)]
+    limiter._virtual_time["background"] = 100.0
+
+    clock[0] = 28.0
+    assert grant_next(limiter, clock) == "interactive"
+    # the background request has now waited 30 seconds
+    assert grant_next(limiter, clock) == "background"
+    background.join(1)
+    for _ in interactive[1:]:
+        grant_next(limiter, clock)
+
+
+def test_threads_disagreeing_on_starvation_do_not_deadlock(monkeypatch):
+    """Two waiters evaluate the starvation of the background one on both
+    sides of `max_wait`: each picks the other, and neither may wait forever"""
+    offsets = {"interactive": 0.2}
+    real_monotonic = time.monotonic
+    monkeypatch.setattr(
+        linkedin,
+        "monotonic",
+        lambda: real_monotonic() + offsets.get(threading.current_thread().name, 0),
+    )
+    limiter = RateLimiter(0.1, max_wait=0.2)
+    limiter.wait()
+    # until it starves, the background request lets the interactive one go
+    limiter._virtual_time["background"] = 1.0
+
+    threads = [
+        threading.Thread(target=limiter.wait, args=(lane,), name=lane, daemon=True)
+        for lane in ("background", "interactive")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(3)
+
+    assert limiter.granted == {"interactive": 2, "background": 1}
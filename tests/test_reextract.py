@@ -0,0 +1,88 @@
+import json
+from urllib.parse import quote
+
+import pytest
+
+import linkedin
+import reextract
+import server
+
+ACTIVITY_URN = "urn:li:activity:7100000000000000000"
+
+
+def search_url(keywords, result_type="CONTENT"):
+    variables = (
+        f"(start:0,origin:GLOBAL_SEARCH_HEADER,query:(keywords:{keywords},"
+        f"flagshipSearchIntent:SEARCH_SRP,queryParameters:List("
+        f"(key:resultType,value:List({result_type}))),"
+        f"includeFiltersInResponse:false))"
+    )
+    return (
+        f"https://www.linkedin.com/voyager/api/graphql?variables={quote(variables)}"
+        "&queryId=voyagerSearchDashClusters.ef3d0937fb65bd7812e32e5a85028e79"
+    )
+
+
+def search_page(text):
+    update = {
+        "metadata": {"backendUrn": ACTIVITY_URN},
+        "commentary": {"text": {"text": text}},
+    }
+    item = {
+        "_type": "com.linkedin.voyager.dash.search.SearchItem",
+        "item": {
+            "searchFeedUpdate": {
+                "_type": "com.linkedin.voyager.dash.search.SearchUpdateWrapper",
+                "update": update,
+            }
+        },
+    }
+    cluster = {
+        "_type": "com.linkedin.voyager.dash.search.SearchClusterViewModel",
+        "items": [item],
+    }
+    return {"data": {"searchDashClustersByAll": {"elements": [cluster]}}}
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    # the installed linkedin-api may be the stock one
+    monkeypatch.setattr(
+        reextract, "parse_search_results", linkedin.parse_search_results
+    )
+    server.scraped_posts.clear()
+    archive = linkedin.ResponseArchive(str(tmp_path / "archive"))
+    yield archive
+    archive.close()
+
+
+def append(archive, url, body, status=200):
+    archive.append(
+        reextract.SEARCH_ENDPOINT, url, status, json.dumps(body).encode(), 1700000000
+    )
+
+
+def test_archived_keywords():
+    assert reextract.archived_keywords(search_url("python rust")) == ["python", "rust"]
+    assert reextract.archived_keywords("https://x/graphql") == []
+
+
+def test_searches_are_replayed_into_the_post_store(archive):
+    append(archive, search_url("python rust"), search_page("Hiring Python devs"))
+    append(archive, search_url("python", "PEOPLE"), search_page("python"))
+    append(archive, search_url("python"), {}, status=429)
+
+    assert reextract.reextract_searches(archive) == (1, 1, 0)
+
+    post = server.scraped_posts.get("7100000000000000000")
+    assert post["keywords"] == ["python"]
+    assert post["matchedFields"] == {"python": ["text"]}
+    assert post["scrapedAt"].startswith("2023-11-1")
+
+
+def test_keywords_can_be_overridden(archive):
+    append(archive, search_url("python"), search_page("machine learning"))
+
+    assert reextract.reextract_searches(archive) == (1, 0, 0)
+    replayed = reextract.reextract_searches(archive, keywords=["machine learning"])
+    assert replayed == (1, 1, 0)
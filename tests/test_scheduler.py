@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from scheduler import MIN_INTERVAL_SECONDS, SubscriptionScheduler
+
+
+@pytest.fixture
+def runs():
+    return []
+
+
+@pytest.fixture
+def scheduler(runs, tmp_path):
+    def run(subscription):
+        runs.append(subscription["keywords"])
+        if subscription["keywords"] == ["broken"]:
+            raise RuntimeError("boom")
+        return {"found": len(runs)}
+
+    scheduler = SubscriptionScheduler(
+        run, path=str(tmp_path / "subscriptions.json"), min_start_gap=0
+    )
+    yield scheduler
+    scheduler.stop()
+
+
+def make_due(scheduler, subscription):
+    with scheduler._cond:
+        scheduler._subscriptions[subscription["id"]]["nextRunAt"] = 0
+        scheduler._cond.notify_all()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_subscriptions_are_persisted(scheduler):
+    subscription = scheduler.create(["python"], interval=1)
+
+    assert subscription["interval"] == MIN_INTERVAL_SECONDS
+    reloaded = SubscriptionScheduler(lambda s: None, path=scheduler.path)
+    assert [s["id"] for s in reloaded.list()] == [subscription["id"]]
+
+    assert scheduler.delete(subscription["id"])
+    assert not scheduler.delete(subscription["id"])
+    assert SubscriptionScheduler(lambda s: None, path=scheduler.path).list() == []
+
+
+def test_due_subscriptions_run_and_are_rescheduled(scheduler, runs):
+    ok = scheduler.create(["python"], interval=120)
+    broken = scheduler.create(["broken"], interval=120)
+    make_due(scheduler, ok)
+    make_due(scheduler, broken)
+    scheduler.start()
+
+    wait_for(lambda: all(s["lastRunAt"] for s in scheduler.list()))
+
+    results = {s["id"]: s for s in scheduler.list()}
+    assert results[ok["id"]]["lastError"] is None
+    assert results[ok["id"]]["lastResult"]["found"] in (1, 2)
+    assert results[broken["id"]]["lastError"] == "boom"
+    for subscription in results.values():
+        assert subscription["nextRunAt"] == subscription["lastRunAt"] + 120
+    assert sorted(runs) == [["broken"], ["python"]]
+
+
+def test_a_subscription_never_runs_twice_at_once():
+    release = threading.Event()
+    runs = []
+
+    def run(subscription):
+        runs.append(subscription["id"])
+        release.wait(5)
+
+    scheduler = SubscriptionScheduler(run, min_start_gap=0)
+    subscription = scheduler.create(["python"], interval=60)
+    make_due(scheduler, subscription)
+    scheduler.start()
+    try:
+        wait_for(lambda: scheduler.list()[0]["running"])
+        make_due(scheduler, subscription)
+        time.sleep(0.2)
+        assert len(runs) == 1
+    finally:
+        release.set()
+        scheduler.stop()
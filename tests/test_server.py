@@ -0,0 +1,328 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+import server
+from linkedin import RateLimiter, RequestBudget
+
+
+@pytest.fixture
+def client():
+    server.scraped_posts.clear()
+    return server.app.test_client()
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    calls = []
+
+    def export_records(pages, path, schema, format="parquet", batch_size=10000):
+        calls.append(path)
+        with open(path, "wb") as f:
+            f.write(b"data")
+        return sum(len(page) for page in pages)
+
+    monkeypatch.setattr(server, "export_records", export_records)
+    return calls
+
+
+def test_export_ignores_client_path(client, exported, tmp_path):
+    target = tmp_path / "owned.txt"
+    res = client.post("/export_posts", json={"path": str(target)})
+
+    assert res.status_code == 200
+    assert not target.exists()
+    assert os.path.dirname(exported[0]) == server.EXPORTS_DIR
+    assert res.json["filename"] == os.path.basename(exported[0])
+    assert res.json["filename"].endswith(".parquet")
+    assert "path" not in res.json
+
+
+def test_export_rejects_unknown_format(client, exported):
+    res = client.post("/export_posts", json={"format": "../../etc/passwd"})
+    assert res.status_code == 400
+    assert exported == []
+
+
+def test_export_download(client, exported):
+    filename = client.post("/export_posts", json={"format": "arrow"}).json["filename"]
+    assert filename.endswith(".arrow")
+
+    res = client.get(f"/exports/{filename}")
+    assert res.status_code == 200
+    assert res.data == b"data"
+    assert client.get("/exports/..%2Fserver.py").status_code == 404
+
+
+def test_since_follows_changes(client):
+    since = server.scraped_posts.version
+    server.scraped_posts.extend([{"id": "1"}, {"id": "2"}])
+    body = client.get(f"/get_scraped_posts?since={since}&limit=1").json
+    assert [post["id"] for post in body["posts"]] == ["1"]
+    assert body["has_more"] and not body["reset"]
+
+    body = client.get(f"/get_scraped_posts?since={body['version']}").json
+    assert [post["id"] for post in body["posts"]] == ["2"]
+    assert not body["has_more"]
+
+    body = client.get(f"/get_scraped_posts?since={body['version']}").json
+    assert body["posts"] == [] and not body["has_more"]
+
+
+def test_reset_after_clear_does_not_loop(client):
+    server.scraped_posts.extend([{"id": "1"}])
+    since = server.scraped_posts.version
+    server.scraped_posts.clear()
+
+    body = client.get(f"/get_scraped_posts?since={since - 1}").json
+    assert body["reset"] and body["posts"] == []
+    assert not body["has_more"]
+    assert body["version"] == server.scraped_posts.version
+
+    body = client.get(f"/get_scraped_posts?since={body['version']}").json
+    assert not body["reset"] and not body["has_more"]
+
+    server.scraped_posts.extend([{"id": "3"}])
+    body = client.get(f"/get_scraped_posts?since={body['version']}").json
+    assert [post["id"] for post in body["posts"]] == ["3"]
+    assert not body["reset"]
+
+
+def test_reset_for_version_from_before_a_restart(client):
+    server.scraped_posts.extend([{"id": "1"}])
+    body = client.get("/get_scraped_posts?since=1000000").json
+    assert body["reset"]
+    assert [post["id"] for post in body["posts"]] == ["1"]
+    assert not body["has_more"]
+
+
+def test_cursor_pages_cover_every_post(client):
+    server.scraped_posts.extend(
+        [{"id": str(i), "createdAt": 1700000000000 + i} for i in range(5)]
+    )
+    ids, cursor = [], ""
+    while True:
+        body = client.get(f"/get_scraped_posts?limit=2&cursor={cursor}").json
+        ids += [post["id"] for post in body["posts"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert ids == ["4", "3", "2", "1", "0"]
+    assert client.get("/get_scraped_posts?cursor=bogus").status_code == 400
+
+
+def test_etag(client):
+    res = client.get("/get_scraped_posts")
+    headers = {"If-None-Match": res.headers["ETag"]}
+    assert client.get("/get_scraped_posts", headers=headers).status_code == 304
+
+    server.scraped_posts.extend([{"id": "1"}])
+    again = client.get("/get_scraped_posts", headers=headers)
+    assert again.status_code == 200
+
+
+class StockClient:
+    """linkedin-api's Linkedin as published: search() only, no run_concurrently()"""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.queries = []
+
+    def search(self, params, limit=None, offset=0):
+        self.queries.append(params["keywords"])
+        # Only passes once every search is in flight at the same time
+        self.barrier.wait()
+        if params["keywords"] == "broken":
+            raise RuntimeError("boom")
+        return []
+
+
+def test_fan_out_without_run_concurrently_is_concurrent(monkeypatch):
+    stock = StockClient(3)
+    monkeypatch.setattr(server, "linkedin_api", stock)
+
+    posts, raw = server.search_posts_by_keywords(
+        ["python", "rust", "broken"], fan_out=True
+    )
+
+    assert sorted(stock.queries) == ["broken", "python", "rust"]
+    assert (posts, raw) == ([], [])
+
+
+class LaneClient:
+    """Records the priority lane of every search"""
+
+    def __init__(self):
+        self.lane = "interactive"
+        self.lanes = []
+
+    @contextmanager
+    def priority(self, lane):
+        previous, self.lane = self.lane, lane
+        try:
+            yield
+        finally:
+            self.lane = previous
+
+    def search(self, params, limit=None, offset=0):
+        self.lanes.append(self.lane)
+        return []
+
+
+def test_subscriptions_poll_in_the_background_lane(monkeypatch):
+    lanes = LaneClient()
+    monkeypatch.setattr(server, "linkedin_api", lanes)
+
+    server.run_subscription({"keywords": ["python"]})
+
+    assert lanes.lanes == ["background"]
+    assert lanes.lane == "interactive"
+
+
+def test_subscription_start_gap(monkeypatch):
+    monkeypatch.setattr(server, "linkedin_api", StockClient(1))
+    assert server.subscription_start_gap() == server.DEFAULT_SUBSCRIPTION_START_GAP
+
+    client = SimpleNamespace(rate_limiter=RateLimiter(2.0), budget=None)
+    monkeypatch.setattr(server, "linkedin_api", client)
+    # a run is 5 pages of results
+    assert server.subscription_start_gap() == 10.0
+
+    client.budget = RequestBudget(daily_cap=10)
+    monkeypatch.setattr(server.time, "time", lambda: RequestBudget.next_day() - 600)
+    # 2 runs left for the last 10 minutes of the day
+    assert server.subscription_start_gap() == 300.0
+    client.budget.daily_cap = 0
+    assert server.subscription_start_gap() == 600.0
+
+    monkeypatch.setattr(server, "SUBSCRIPTION_START_GAP", "42")
+    assert server.subscription_start_gap() == 42.0
+
+
+def update(activity_id, text):
+    urn = f"urn:li:activity:{activity_id}"
+    commentary = {"text": {"text": text}}
+    return {"update": {"metadata": {"backendUrn": urn}, "commentary": commentary}}
+
+
+class FanOutClient(LaneClient):
+    """A client with run_concurrently() and canned search results"""
+
+    def __init__(self, results):
+        super().__init__()
+        self.results = results
+        self.searches = []
+        self.run_lanes = []
+
+    def run_concurrently(self, func, items, max_workers=None, lane=None):
+        self.run_lanes.append(lane or self.lane)
+        for item in items:
+            try:
+                yield item, func(item), None
+            except Exception as e:
+                yield item, None, e
+
+    def search(self, params, limit=None, offset=0):
+        self.searches.append((params["keywords"], limit, offset))
+        return self.results.get(params["keywords"], [])
+
+
+@pytest.fixture
+def post_ids():
+    # activity IDs carrying the current time, so that the posts are recent
+    now_id = int(time.time() * 1000) << 22
+    return [str(now_id + i) for i in range(3)]
+
+
+def test_fan_out_merges_posts_found_by_several_keywords(monkeypatch, post_ids):
+    both, python_only, rust_only = post_ids
+    client = FanOutClient(
+        {
+            "python": [update(both, "Python and Rust"), update(python_only, "Python")],
+            "rust": [update(both, "Python and Rust"), update(rust_only, "Rust")],
+        }
+    )
+    monkeypatch.setattr(server, "linkedin_api", client)
+
+    with client.priority("background"):
+        posts, raw = server.search_posts_by_keywords(
+            ["python", "rust"], limit=20, offset=5, fan_out=True
+        )
+
+    assert sorted(client.searches) == [("python", 20, 5), ("rust", 20, 5)]
+    assert client.run_lanes == ["background"]
+    assert len(raw) == 4
+    by_id = {post["id"]: post for post in posts}
+    assert sorted(by_id) == sorted(post_ids)
+    assert by_id[both]["keywords"] == ["python", "rust"]
+    assert by_id[both]["matchedFields"] == {"python": ["text"], "rust": ["text"]}
+    assert by_id[rust_only]["keywords"] == ["rust"]
+
+
+def test_single_query_is_sent_directly(monkeypatch, post_ids):
+    client = FanOutClient({"python rust": [update(post_ids[0], "rust")]})
+    monkeypatch.setattr(server, "linkedin_api", client)
+
+    posts, _ = server.search_posts_by_keywords(["python", "rust"], limit=7)
+
+    assert client.searches == [("python rust", 7, 0)]
+    assert client.run_lanes == []
+    assert [post["keywords"] for post in posts] == [["rust"]]
+
+
+def open_stream(client, **headers):
+    return client.get("/stream_posts", headers=headers, buffered=False)
+
+
+def test_stream_resumes_after_last_event_id(client):
+    for i in range(1, 4):
+        server.scraped_posts.upsert({"id": str(i), "createdAt": i})
+    first = server.scraped_posts.version - 2
+
+    res = open_stream(client, **{"Last-Event-ID": str(first)})
+    try:
+        assert next(res.response) == b"retry: 5000\n\n"
+        event = next(res.response).decode()
+    finally:
+        res.close()
+
+    assert event.startswith(f"id: {server.scraped_posts.version}\nevent: posts\n")
+    assert '"count": 2' in event
+    posts = json.loads(event.split("data: ")[1])["posts"]
+    assert [post["id"] for post in posts] == ["2", "3"]
+
+
+def test_stream_resets_after_a_clear(client):
+    server.scraped_posts.upsert({"id": "1", "createdAt": 1})
+    before = server.scraped_posts.version
+    server.scraped_posts.clear()
+
+    res = open_stream(client, **{"Last-Event-ID": str(before)})
+    try:
+        next(res.response)
+        event = next(res.response).decode()
+    finally:
+        res.close()
+
+    version = server.scraped_posts.cleared_version
+    assert event == f"id: {version}\nevent: reset\ndata: {{}}\n\n"
+
+
+def test_stream_slots_are_released_by_unread_streams(client, monkeypatch):
+    monkeypatch.setattr(server, "MAX_STREAM_CLIENTS", 1)
+
+    # a response closed before the server started iterating it
+    with server.app.test_request_context("/stream_posts"):
+        unread = server.stream_posts()
+        assert open_stream(client).status_code == 503
+        unread.close()
+
+    res = open_stream(client)
+    assert res.status_code == 200
+    res.close()
+    assert server.stream_clients == 0
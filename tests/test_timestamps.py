@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from timestamps import (
+    TIMESTAMP_SHIFT,
+    parse_relative_time,
+    post_timestamp,
+    to_timestamp,
+    urn_datetime,
+    urn_timestamp,
+)
+
+CREATED_MS = 1692771911621
+ACTIVITY_ID = CREATED_MS << TIMESTAMP_SHIFT
+
+
+@pytest.mark.parametrize("kind", ["activity", "share", "ugcPost"])
+def test_urn_timestamp(kind):
+    assert urn_timestamp(f"urn:li:{kind}:{ACTIVITY_ID}") == CREATED_MS
+
+
+def test_urn_timestamp_inside_other_urns():
+    urn = f"urn:li:fs_updateV2:(urn:li:activity:{ACTIVITY_ID},MEMBER_SHARES)"
+
+    assert urn_timestamp(urn) == CREATED_MS
+    assert urn_datetime(urn) == datetime.fromtimestamp(CREATED_MS / 1000)
+
+
+@pytest.mark.parametrize(
+    "urn", [None, "", "urn:li:member:123", "urn:li:activity:123", 42]
+)
+def test_urn_timestamp_rejects_non_timestamps(urn):
+    assert urn_timestamp(urn) is None
+
+
+def test_parse_relative_time():
+    now = datetime(2024, 5, 1, 12)
+
+    assert parse_relative_time("3w •", now) == now - timedelta(weeks=3)
+    assert parse_relative_time("20h", now) == now - timedelta(hours=20)
+    assert parse_relative_time("2 days ago", now) == now - timedelta(days=2)
+    assert parse_relative_time("1yr", now) == now - timedelta(days=365)
+    assert parse_relative_time("5 fortnights", now) is None
+    assert parse_relative_time("just now", now) is None
+    assert parse_relative_time(None, now) is None
+
+
+def test_to_timestamp():
+    iso = "2024-05-01T12:00:00Z"
+
+    assert to_timestamp(1714564800000) == 1714564800000
+    assert to_timestamp(iso) == int(datetime(2024, 5, 1, 12).timestamp() * 1000)
+    assert to_timestamp(True) is None
+    assert to_timestamp("yesterday") is None
+
+
+def test_post_timestamp_prefers_the_urn():
+    post = {
+        "urn": "urn:li:member:1",
+        "entityUrn": f"urn:li:activity:{ACTIVITY_ID}",
+        "createdAt": 5,
+    }
+
+    assert post_timestamp(post) == CREATED_MS
+    assert post_timestamp({"scrapedAt": 7}) == 7
+    assert post_timestamp({}) == 0